@@ -0,0 +1,52 @@
+"""create sales rollup
+
+Revision ID: 3a9f0c6e1d42
+Revises: 8c1e4a7d2b30
+Create Date: 2026-01-12 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3a9f0c6e1d42"
+down_revision: Union[str, None] = "8c1e4a7d2b30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sales_rollup",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=True),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("sales_count", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.BigInteger(), nullable=False),
+        sa.Column("total_price", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "year",
+            "month",
+            name="uq_sales_rollup",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+    op.create_index(op.f("ix_sales_rollup_id"), "sales_rollup", ["id"], unique=False)
+    op.execute(
+        """
+        INSERT INTO sales_rollup (year, month, sales_count, quantity, total_price)
+        SELECT CAST(EXTRACT(year FROM date) AS INTEGER), month, count(*),
+               sum(quantity), sum(total_price)
+        FROM sales
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_sales_rollup_id"), table_name="sales_rollup")
+    op.drop_table("sales_rollup")
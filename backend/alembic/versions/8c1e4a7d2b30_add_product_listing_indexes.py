@@ -0,0 +1,44 @@
+"""add product listing indexes
+
+Revision ID: 8c1e4a7d2b30
+Revises: 5d4b1e2f9a10
+Create Date: 2026-01-12 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c1e4a7d2b30"
+down_revision: Union[str, None] = "5d4b1e2f9a10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_products_category_id_id", "products", ["category_id", "id"], unique=False
+    )
+    op.create_index("ix_products_brand_id", "products", ["brand", "id"], unique=False)
+    op.create_index(
+        "ix_products_lower_name_prefix",
+        "products",
+        [sa.text("lower(name) text_pattern_ops")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_products_price_numeric_id",
+        "products",
+        [sa.text("(price::numeric)"), "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_price_numeric_id", table_name="products")
+    op.drop_index("ix_products_lower_name_prefix", table_name="products")
+    op.drop_index("ix_products_brand_id", table_name="products")
+    op.drop_index("ix_products_category_id_id", table_name="products")
@@ -0,0 +1,27 @@
+"""add sales date and product indexes
+
+Revision ID: 9e2b7d41c0f5
+Revises: 3a9f0c6e1d42
+Create Date: 2026-01-13 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e2b7d41c0f5"
+down_revision: Union[str, None] = "3a9f0c6e1d42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_sales_date"), "sales", ["date"], unique=False)
+    op.create_index(op.f("ix_sales_product_id"), "sales", ["product_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_sales_product_id"), table_name="sales")
+    op.drop_index(op.f("ix_sales_date"), table_name="sales")
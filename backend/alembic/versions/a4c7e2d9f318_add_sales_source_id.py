@@ -0,0 +1,30 @@
+"""add sales source id
+
+Revision ID: a4c7e2d9f318
+Revises: f1d9c3a7e286
+Create Date: 2026-01-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c7e2d9f318"
+down_revision: Union[str, None] = "f1d9c3a7e286"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("sales", sa.Column("source", sa.String(length=100), nullable=True))
+    op.add_column("sales", sa.Column("source_id", sa.BigInteger(), nullable=True))
+    op.create_unique_constraint("uq_sales_source", "sales", ["source", "source_id"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_sales_source", "sales", type_="unique")
+    op.drop_column("sales", "source_id")
+    op.drop_column("sales", "source")
@@ -0,0 +1,57 @@
+"""add case-insensitive unique index on category name
+
+Revision ID: b47d2e9a6c13
+Revises: 9e2b7d41c0f5
+Create Date: 2026-01-13 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b47d2e9a6c13"
+down_revision: Union[str, None] = "9e2b7d41c0f5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Names were not unique before, so merge case-insensitive duplicates into
+    # the oldest category (lowest id) before building the index.
+    op.execute(
+        """
+        CREATE TEMPORARY TABLE category_merges ON COMMIT DROP AS
+        SELECT id, min(id) OVER (PARTITION BY lower(name)) AS keep_id
+        FROM categories
+        """
+    )
+    op.execute(
+        """
+        UPDATE products
+        SET category_id = category_merges.keep_id
+        FROM category_merges
+        WHERE products.category_id = category_merges.id
+          AND category_merges.id <> category_merges.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM categories
+        USING category_merges
+        WHERE categories.id = category_merges.id
+          AND category_merges.id <> category_merges.keep_id
+        """
+    )
+    op.create_index(
+        "uq_categories_lower_name",
+        "categories",
+        [sa.text("lower(name)")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_categories_lower_name", table_name="categories")
@@ -0,0 +1,33 @@
+"""cover sales date index with totals
+
+Revision ID: b9e4f0a2c617
+Revises: a4c7e2d9f318
+Create Date: 2026-01-24 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b9e4f0a2c617"
+down_revision: Union[str, None] = "a4c7e2d9f318"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_sales_date_totals",
+        "sales",
+        ["date"],
+        unique=False,
+        postgresql_include=["month", "quantity", "total_price"],
+    )
+    op.drop_index(op.f("ix_sales_date"), table_name="sales")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_sales_date"), "sales", ["date"], unique=False)
+    op.drop_index("ix_sales_date_totals", table_name="sales")
@@ -0,0 +1,37 @@
+"""add product search trgm indexes
+
+Revision ID: c3e8a1f5d294
+Revises: b9e4f0a2c617
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3e8a1f5d294"
+down_revision: Union[str, None] = "b9e4f0a2c617"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ("name", "brand", "description")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f"ix_products_{column}_trgm",
+            "products",
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for column in reversed(SEARCH_COLUMNS):
+        op.drop_index(f"ix_products_{column}_trgm", table_name="products")
@@ -0,0 +1,49 @@
+"""convert product price to numeric
+
+Revision ID: d82c6b0f4e19
+Revises: c5a1f8e3b720
+Create Date: 2026-01-14 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d82c6b0f4e19"
+down_revision: Union[str, None] = "c5a1f8e3b720"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_products_price_numeric_id", table_name="products")
+    op.alter_column(
+        "products",
+        "price",
+        existing_type=sa.String(length=120),
+        type_=sa.Numeric(12, 2),
+        existing_nullable=False,
+        postgresql_using="round(price::numeric, 2)",
+    )
+    op.create_index("ix_products_price_id", "products", ["price", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_price_id", table_name="products")
+    op.alter_column(
+        "products",
+        "price",
+        existing_type=sa.Numeric(12, 2),
+        type_=sa.String(length=120),
+        existing_nullable=False,
+        postgresql_using="price::text",
+    )
+    op.create_index(
+        "ix_products_price_numeric_id",
+        "products",
+        [sa.text("(price::numeric)"), "id"],
+        unique=False,
+    )
@@ -0,0 +1,44 @@
+"""create table versions
+
+Revision ID: e6f3a2b9d054
+Revises: d82c6b0f4e19
+Create Date: 2026-01-15 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6f3a2b9d054"
+down_revision: Union[str, None] = "d82c6b0f4e19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    table_versions = op.create_table(
+        "table_versions",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.bulk_insert(
+        table_versions,
+        [
+            {"name": name, "version": 0}
+            for name in ("categories", "products", "sales", "monthly_sales")
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("table_versions")
@@ -0,0 +1,36 @@
+"""cascade sales product foreign key
+
+Revision ID: f1d9c3a7e286
+Revises: e6f3a2b9d054
+Create Date: 2026-01-15 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1d9c3a7e286"
+down_revision: Union[str, None] = "e6f3a2b9d054"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint("sales_product_id_fkey", "sales", type_="foreignkey")
+    op.create_foreign_key(
+        "sales_product_id_fkey",
+        "sales",
+        "products",
+        ["product_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("sales_product_id_fkey", "sales", type_="foreignkey")
+    op.create_foreign_key(
+        "sales_product_id_fkey", "sales", "products", ["product_id"], ["id"]
+    )
@@ -0,0 +1,97 @@
+"""Compare the default and the fast JSON path for GET /products/.
+
+The default path mirrors what FastAPI does with ``response_model``: validate
+every ORM object through ``ProductOut`` and encode the result with the stdlib
+``json`` module. The fast path encodes column-only rows with orjson.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_serialization --products 100000
+"""
+import argparse
+import json
+import statistics
+import time
+from collections import namedtuple
+from decimal import Decimal
+
+from pydantic import TypeAdapter
+
+from benchmarks.datagen import iter_product_rows
+from models import Product
+from schemas import ProductOut
+from services.fast_json import encode_rows
+
+ProductRow = namedtuple(
+    "ProductRow", ["id", "name", "description", "category_id", "price", "brand"]
+)
+
+
+def make_products(count, seed=42):
+    return [
+        Product(
+            id=product_id,
+            name=name,
+            description=description,
+            category_id=category_id,
+            price=Decimal(price),
+            brand=brand,
+        )
+        for product_id, name, description, price, category_id, brand in iter_product_rows(
+            count, categories=50, seed=seed
+        )
+    ]
+
+
+def default_path(products):
+    adapter = TypeAdapter(list[ProductOut])
+    validated = adapter.validate_python(products, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_path(rows):
+    return encode_rows(rows)
+
+
+def measure(func, payload, repeat):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(func(payload))
+        timings.append(time.perf_counter() - started)
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "min_ms": round(min(timings) * 1000, 2),
+        "bytes": size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    products = make_products(args.products)
+    rows = [
+        ProductRow(p.id, p.name, p.description, p.category_id, float(p.price), p.brand)
+        for p in products
+    ]
+
+    default = measure(default_path, products, args.repeat)
+    fast = measure(fast_path, rows, args.repeat)
+    report = {
+        "products": args.products,
+        "default": default,
+        "fast": fast,
+        "speedup": round(default["median_ms"] / fast["median_ms"], 1),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
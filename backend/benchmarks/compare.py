@@ -0,0 +1,47 @@
+"""Print the per-scenario difference between two ``benchmarks.run`` reports.
+
+    python -m benchmarks.compare baseline.json candidate.json
+"""
+import argparse
+import json
+
+METRICS = ("p50_ms", "p99_ms", "throughput_rps", "peak_rss_mb")
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _change(old, new):
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    baseline = _load(args.baseline)
+    candidate = _load(args.candidate)
+    for key in ("seed", "products", "sales", "years"):
+        if baseline["meta"].get(key) != candidate["meta"].get(key):
+            print(f"aviso: {key} difere entre os relatorios")
+
+    print(f"{'scenario':<24}" + "".join(f"{metric:>26}" for metric in METRICS))
+    for name, old in baseline["scenarios"].items():
+        new = candidate["scenarios"].get(name)
+        if new is None:
+            continue
+        cells = [
+            f"{old[metric]:>9} -> {new[metric]:<9} {_change(old[metric], new[metric]):>6}"
+            for metric in METRICS
+        ]
+        print(f"{name:<24}" + "".join(f"{cell:>26}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Seeded synthetic data modeled on ``Docs/*.csv``.
+
+Run from ``backend/`` to write the three CSV files::
+
+    python -m benchmarks.datagen --out /tmp/bench --categories 50 \
+        --products 100000 --sales 2000000 --years 2023 2024 2025
+"""
+import argparse
+import csv
+import io
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+CATEGORY_NAMES = [
+    "TVs",
+    "Refrigerators",
+    "Laptops",
+    "Microwaves",
+    "Washing Machines",
+    "Smartphones",
+    "Air Conditioners",
+    "Headphones",
+]
+BRANDS = ["Samsung", "LG", "Sony", "Philips", "Dell", "HP", "Brastemp", "Electrolux"]
+ADJECTIVES = ["Smart", "Pro", "Max", "Ultra", "Lite", "Plus", "Eco", "Prime"]
+
+
+def iter_category_rows(count):
+    for category_id in range(1, count + 1):
+        base = CATEGORY_NAMES[(category_id - 1) % len(CATEGORY_NAMES)]
+        suffix = (category_id - 1) // len(CATEGORY_NAMES)
+        yield category_id, base if suffix == 0 else f"{base} {suffix + 1}"
+
+
+def product_prices(count, seed=42):
+    rng = random.Random(seed + 1)
+    return [rng.randint(4999, 499999) for _ in range(count)]
+
+
+def iter_product_rows(count, categories, seed=42):
+    rng = random.Random(seed)
+    prices = product_prices(count, seed)
+    for product_id in range(1, count + 1):
+        brand = rng.choice(BRANDS)
+        adjective = rng.choice(ADJECTIVES)
+        category_id = rng.randint(1, categories)
+        yield (
+            product_id,
+            f"{brand} {adjective} {product_id}",
+            f"{adjective} model {product_id} by {brand} for category {category_id}",
+            f"{prices[product_id - 1] / 100:.2f}",
+            category_id,
+            brand,
+        )
+
+
+def iter_sale_rows(count, products, years, seed=42):
+    rng = random.Random(seed + 2)
+    prices = product_prices(products, seed)
+    first_day = date(min(years), 1, 1)
+    span = (date(max(years) + 1, 1, 1) - first_day).days
+    for sale_id in range(1, count + 1):
+        product_id = rng.randint(1, products)
+        quantity = rng.randint(1, 20)
+        sold_on = first_day + timedelta(days=rng.randrange(span))
+        total_price = prices[product_id - 1] * quantity
+        yield (
+            sale_id,
+            product_id,
+            quantity,
+            f"{total_price / 100:.2f}",
+            sold_on.isoformat(),
+        )
+
+
+def csv_bytes(header, rows):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return output.getvalue().encode("utf-8")
+
+
+CATEGORY_HEADER = ["id", "name"]
+PRODUCT_HEADER = ["id", "name", "description", "price", "category_id", "brand"]
+SALE_HEADER = ["id", "product_id", "quantity", "total_price", "date"]
+
+
+def write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--sales", type=int, default=100_000)
+    parser.add_argument("--years", type=int, nargs="+", default=[2024, 2025])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    write_csv(args.out / "categories.csv", CATEGORY_HEADER, iter_category_rows(args.categories))
+    write_csv(
+        args.out / "products.csv",
+        PRODUCT_HEADER,
+        iter_product_rows(args.products, args.categories, args.seed),
+    )
+    write_csv(
+        args.out / "sales.csv",
+        SALE_HEADER,
+        iter_sale_rows(args.sales, args.products, args.years, args.seed),
+    )
+
+
+if __name__ == "__main__":
+    main()
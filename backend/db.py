@@ -1,14 +1,128 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import os
+import time
+from uuid import uuid4
 
-DATABASE_URL = "postgresql://app:app@db:5432/app_db"
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://app:app@db:5432/app_db")
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
 
-def get_db():
-    db = SessionLocal()
-    try:
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", "0"))
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "0") == "1"
+
+
+class PoolStats:
+    def __init__(self):
+        self.checked_out = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def record_wait(self, elapsed):
+        self.waits += 1
+        self.wait_total += elapsed
+        self.wait_max = max(self.wait_max, elapsed)
+
+
+pool_stats = PoolStats()
+
+
+class _WaitTimingMixin:
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record_wait(time.perf_counter() - started)
+
+
+class TimedQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_WaitTimingMixin, NullPool):
+    pass
+
+
+def _engine_options():
+    server_settings = {}
+    if DB_STATEMENT_TIMEOUT:
+        server_settings["statement_timeout"] = str(DB_STATEMENT_TIMEOUT)
+    connect_args = {"server_settings": server_settings}
+    options = {"pool_pre_ping": True, "pool_recycle": DB_POOL_RECYCLE}
+
+    if DB_PGBOUNCER:
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+        options["poolclass"] = TimedNullPool
+    else:
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    options["connect_args"] = connect_args
+    return options
+
+
+engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options())
+SessionLocal = async_sessionmaker(
+    bind=engine, autoflush=False, expire_on_commit=False
+)
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_stats.checked_out += 1
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    pool_stats.checked_out -= 1
+
+
+def get_pool_stats():
+    pool = engine.pool
+    stats = {
+        "mode": "pgbouncer" if DB_PGBOUNCER else "queue",
+        "pool_class": type(pool).__name__,
+        "checked_out": pool_stats.checked_out,
+        "idle": 0,
+        "waits": pool_stats.waits,
+        "wait_avg_ms": (
+            round(pool_stats.wait_total / pool_stats.waits * 1000, 3)
+            if pool_stats.waits
+            else 0.0
+        ),
+        "wait_max_ms": round(pool_stats.wait_max * 1000, 3),
+        "timeouts": pool_stats.timeouts,
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            idle=pool.checkedin(),
+            overflow=pool.overflow(),
+            max_overflow=DB_MAX_OVERFLOW,
+            timeout=DB_POOL_TIMEOUT,
+        )
+    return stats
+
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
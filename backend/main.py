@@ -1,15 +1,31 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import products, categories, sales
+from metrics import MetricsMiddleware
+from routers import products, categories, sales, analytics, jobs, system
+from services.jobs_services import fail_interrupted_jobs
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await fail_interrupted_jobs()
+    yield
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://localhost:8080"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "Server-Timing"],
 )
+app.add_middleware(MetricsMiddleware)
 app.include_router(products.router)
 app.include_router(categories.router)
 app.include_router(sales.router)
+app.include_router(analytics.router)
+app.include_router(jobs.router)
+app.include_router(system.router)
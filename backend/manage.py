@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+
+from db import SessionLocal
+from services.rollup_services import rebuild_sales_rollup
+
+
+async def rebuild_rollup(args):
+    async with SessionLocal() as db:
+        buckets = await rebuild_sales_rollup(db)
+    print(f"sales_rollup reconstruida: {buckets} meses")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comandos administrativos do backend")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = subparsers.add_parser(
+        "rebuild-rollup", help="Recalcula a tabela sales_rollup a partir de sales"
+    )
+    rebuild.set_defaults(handler=rebuild_rollup)
+
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
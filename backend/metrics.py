@@ -0,0 +1,238 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from db import engine, get_pool_stats
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.statements} statements, '
+            f'{self.rows} rows", total;dur={self.elapsed() * 1000:.1f}'
+        )
+
+
+current_request = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricFamily:
+    def __init__(self, name, help_text, kind, label_names=(), buckets=None):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series = {}
+
+    def inc(self, labels=(), amount=1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def observe(self, value, labels=()):
+        histogram = self.series.get(labels)
+        if histogram is None:
+            histogram = self.series[labels] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self.series.items()):
+            pairs = list(zip(self.label_names, labels))
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{_format_labels(pairs)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*value.buckets, "+Inf"), value.counts):
+                cumulative += count
+                bucket_labels = _format_labels(pairs + [("le", bound)])
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {value.sum}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {value.count}")
+        return lines
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+REQUEST_LABELS = ("method", "route")
+
+requests_total = MetricFamily(
+    "http_requests_total",
+    "Requisicoes HTTP por rota e status.",
+    "counter",
+    ("method", "route", "status"),
+)
+request_duration = MetricFamily(
+    "http_request_duration_seconds",
+    "Latencia total das requisicoes HTTP.",
+    "histogram",
+    REQUEST_LABELS,
+    LATENCY_BUCKETS,
+)
+request_db_duration = MetricFamily(
+    "http_request_db_duration_seconds",
+    "Tempo gasto no banco por requisicao.",
+    "histogram",
+    REQUEST_LABELS,
+    LATENCY_BUCKETS,
+)
+request_db_statements = MetricFamily(
+    "http_request_db_statements",
+    "Comandos SQL executados por requisicao.",
+    "histogram",
+    REQUEST_LABELS,
+    STATEMENT_BUCKETS,
+)
+request_db_rows = MetricFamily(
+    "http_request_db_rows_total",
+    "Linhas retornadas pelo banco por rota.",
+    "counter",
+    REQUEST_LABELS,
+)
+statement_duration = MetricFamily(
+    "db_statement_duration_seconds",
+    "Duracao de cada comando SQL, dentro ou fora de requisicoes.",
+    "histogram",
+    buckets=LATENCY_BUCKETS,
+)
+FAMILIES = (
+    requests_total,
+    request_duration,
+    request_db_duration,
+    request_db_statements,
+    request_db_rows,
+    statement_duration,
+)
+
+
+def add_rows(count):
+    metrics = current_request.get()
+    if metrics is not None:
+        metrics.rows += count
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    statement_duration.observe(elapsed)
+    metrics = current_request.get()
+    if metrics is None:
+        return
+    metrics.statements += 1
+    metrics.db_time += elapsed
+    if cursor.description is not None and cursor.rowcount > 0:
+        metrics.rows += cursor.rowcount
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def _route_template(scope):
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    for route in scope["app"].routes:
+        if getattr(route, "endpoint", None) is endpoint:
+            return route.path
+    return "unmatched"
+
+
+def record_request(method, route, status, metrics):
+    labels = (method, route)
+    requests_total.inc((method, route, str(status)))
+    request_duration.observe(metrics.elapsed(), labels)
+    request_db_duration.observe(metrics.db_time, labels)
+    request_db_statements.observe(metrics.statements, labels)
+    request_db_rows.inc(labels, metrics.rows)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", metrics.server_timing()
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            record_request(scope["method"], _route_template(scope), status, metrics)
+
+
+def render_metrics():
+    lines = []
+    for family in FAMILIES:
+        lines.extend(family.render())
+
+    pool = get_pool_stats()
+    for name, key, kind, help_text in (
+        ("db_pool_checked_out", "checked_out", "gauge", "Conexoes em uso."),
+        ("db_pool_idle", "idle", "gauge", "Conexoes ociosas no pool."),
+        ("db_pool_waits_total", "waits", "counter", "Esperas por conexao."),
+        ("db_pool_timeouts_total", "timeouts", "counter", "Timeouts ao obter conexao."),
+    ):
+        lines.extend(
+            (f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {pool[key]}")
+        )
+    return "\n".join(lines) + "\n"
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Date, UniqueConstraint
+from sqlalchemy import BigInteger, Column, DateTime, Integer, Index, Numeric, String, ForeignKey, Date, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -11,6 +12,11 @@ class Category(Base):
 
     products = relationship("Product", back_populates="category")
 
+Index("uq_categories_lower_name", func.lower(Category.name), unique=True)
+
+MAX_PRODUCT_PRICE = 10**10  # Product.price is NUMERIC(12, 2)
+
+
 class Product(Base):
     __tablename__ = "products"
 
@@ -18,27 +24,69 @@ class Product(Base):
     description = Column(String(120), nullable=False)
     name = Column(String(100), nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
-    price = Column(String(120), nullable=False)
+    price = Column(Numeric(12, 2), nullable=False)
     brand = Column(String(120), nullable=False)
 
 
     category = relationship("Category", back_populates="products")
-    sales = relationship("Sale", back_populates="products")
+    sales = relationship("Sale", back_populates="products", passive_deletes=True)
+
+
+Index("ix_products_category_id_id", Product.category_id, Product.id)
+Index("ix_products_brand_id", Product.brand, Product.id)
+Index(
+    "ix_products_lower_name_prefix",
+    func.lower(Product.name).label("lower_name"),
+    postgresql_ops={"lower_name": "text_pattern_ops"},
+)
+Index("ix_products_price_id", Product.price, Product.id)
+Index(
+    "ix_products_name_trgm",
+    Product.name,
+    postgresql_using="gin",
+    postgresql_ops={"name": "gin_trgm_ops"},
+)
+Index(
+    "ix_products_brand_trgm",
+    Product.brand,
+    postgresql_using="gin",
+    postgresql_ops={"brand": "gin_trgm_ops"},
+)
+Index(
+    "ix_products_description_trgm",
+    Product.description,
+    postgresql_using="gin",
+    postgresql_ops={"description": "gin_trgm_ops"},
+)
 
 
 class Sale(Base):
     __tablename__ = "sales"
+    __table_args__ = (UniqueConstraint("source", "source_id", name="uq_sales_source"),)
 
     id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    product_id = Column(
+        Integer,
+        ForeignKey("products.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
     month = Column(Integer, nullable=False)
     quantity = Column(Integer, nullable=False)
     total_price = Column(Integer, nullable=False)
     date = Column(Date, nullable=True)
+    source = Column(String(100), nullable=True)
+    source_id = Column(BigInteger, nullable=True)
 
     products = relationship("Product", back_populates="sales")
 
 
+Index(
+    "ix_sales_date_totals",
+    Sale.date,
+    postgresql_include=["month", "quantity", "total_price"],
+)
+
 class MonthlySales(Base):
     __tablename__ = "monthly_sales"
     __table_args__ = (UniqueConstraint("year", "month", name="uq_monthly_sales"),)
@@ -48,3 +96,49 @@ class MonthlySales(Base):
     month = Column(Integer, nullable=False)
     quantity = Column(Integer, nullable=False)
     total_price = Column(Integer, nullable=False)
+
+
+class SalesRollup(Base):
+    __tablename__ = "sales_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "year",
+            "month",
+            name="uq_sales_rollup",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    year = Column(Integer, nullable=True)
+    month = Column(Integer, nullable=False)
+    sales_count = Column(Integer, nullable=False)
+    quantity = Column(BigInteger, nullable=False)
+    total_price = Column(BigInteger, nullable=False)
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    rows_parsed = Column(Integer, nullable=False, default=0)
+    rows_inserted = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    result = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
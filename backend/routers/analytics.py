@@ -0,0 +1,64 @@
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import get_db
+from schemas import (
+    BrandRevenueItem,
+    CategoryRevenueItem,
+    MonthShareItem,
+    ProductRevenueItem,
+)
+from services.analytics_services import (
+    month_share,
+    revenue_by_brand,
+    revenue_by_category,
+    top_products,
+)
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/top-products", response_model=list[ProductRevenueItem])
+async def get_top_products(
+    limit: int = Query(default=10, ge=1, le=1000),
+    year: int | None = Query(default=None),
+    start: date | None = Query(default=None),
+    end: date | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    return await top_products(db, limit, year, start, end)
+
+
+@router.get("/categories", response_model=list[CategoryRevenueItem])
+async def get_revenue_by_category(
+    year: int | None = Query(default=None),
+    start: date | None = Query(default=None),
+    end: date | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    return await revenue_by_category(db, year, start, end)
+
+
+@router.get("/brands", response_model=list[BrandRevenueItem])
+async def get_revenue_by_brand(
+    year: int | None = Query(default=None),
+    start: date | None = Query(default=None),
+    end: date | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    return await revenue_by_brand(db, year, start, end)
+
+
+@router.get("/month-share", response_model=list[MonthShareItem])
+async def get_month_share(
+    by: Literal["product", "category", "brand"] = Query(default="product"),
+    limit: int = Query(default=5, ge=1, le=100),
+    year: int | None = Query(default=None),
+    start: date | None = Query(default=None),
+    end: date | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    return await month_share(db, by, limit, year, start, end)
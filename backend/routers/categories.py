@@ -1,39 +1,69 @@
-from fastapi import APIRouter, Depends, File, UploadFile
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 from db import get_db
 from schemas import CategoryCreate, CategoryUpdate, CategoryOut, ApiResponse
 
 from services.categories_services import (
     list_categories,
+    list_category_rows,
     create_category,
     edit_category,
     import_categories_from_csv,
 )
+from services.fast_json import rows_response
+from services.compression import UploadTooLarge, read_upload
+from services.jobs_services import start_import_job
+from services.versions_services import get_conditional
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
 @router.get("/", response_model=list[CategoryOut])
-def get_categories(db: Session = Depends(get_db)):
-    return list_categories(db)
+async def get_categories(
+    request: Request,
+    response: Response,
+    fast: bool = Query(default=False),
+    db: AsyncSession = Depends(get_db),
+):
+    headers, not_modified = await get_conditional(db, request, "categories")
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    if fast:
+        return rows_response(await list_category_rows(db), headers)
+    response.headers.update(headers)
+    return await list_categories(db)
 
 @router.post("/", response_model=ApiResponse[CategoryOut])
-def create_category_endpoint(payload: CategoryCreate, db: Session = Depends(get_db)):
-    category = create_category(db, payload)
+async def create_category_endpoint(payload: CategoryCreate, db: AsyncSession = Depends(get_db)):
+    category = await create_category(db, payload)
     if not category:
         return ApiResponse(success=False, message="Categoria ja existe")
     return ApiResponse(success=True, message="Categoria criada", data=category)
 
 @router.put("/{category_id}")
-def edit_category_endpoint(category_id: int, payload: CategoryUpdate, response_model=ApiResponse, db: Session = Depends(get_db)):
-    return edit_category(db, category_id, payload)
+async def edit_category_endpoint(category_id: int, payload: CategoryUpdate, response_model=ApiResponse, db: AsyncSession = Depends(get_db)):
+    return await edit_category(db, category_id, payload)
 
 
 @router.post("/upload", response_model=ApiResponse)
 async def upload_categories_csv(
-    file: UploadFile = File(...), db: Session = Depends(get_db)
+    response: Response,
+    file: UploadFile = File(...),
+    background: bool = Query(default=False),
+    db: AsyncSession = Depends(get_db),
 ):
-    contents = await file.read()
-    result = import_categories_from_csv(db, contents)
+    try:
+        contents = await read_upload(file)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if background:
+        job = await start_import_job(db, "categories", import_categories_from_csv, contents)
+        response.status_code = 202
+        return ApiResponse(
+            success=True, message="Importacao agendada", data={"job_id": job.id}
+        )
+    result = await import_categories_from_csv(db, contents)
     if result["errors"]:
         return ApiResponse(success=False, message="CSV invalido", data=result)
-    return ApiResponse(success=True, message="Importacao concluida", data=result)
+    return ApiResponse(success=True, message="Importacao concluida", data=result)
\ No newline at end of file
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import get_db
+from schemas import ApiResponse, ImportJobOut
+from services.jobs_services import get_job
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=ApiResponse[ImportJobOut])
+async def get_job_endpoint(job_id: int, db: AsyncSession = Depends(get_db)):
+    job = await get_job(db, job_id)
+    if not job:
+        return ApiResponse(success=False, message="Job nao encontrado")
+    return ApiResponse(success=True, data=job)
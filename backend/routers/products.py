@@ -1,74 +1,147 @@
-import csv
-import io
+from decimal import Decimal
+from typing import Literal
 
-from fastapi import APIRouter, Depends, File, UploadFile
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 from db import get_db
-from schemas import ProductCreate, ProductUpdate, ProductOut, ApiResponse
+from schemas import ProductBulkDelete, ProductCreate, ProductUpdate, ProductOut, ProductSearchItem, ApiResponse
 
+from services.fast_json import rows_response
 from services.products_services import (
+    PRODUCT_ROW_COLUMNS,
     list_products,
+    search_products,
     create_product,
     edit_product,
     delete_product,
+    delete_products,
     import_products_from_csv,
+    iter_products_export,
 )
+from services.arrow_io import EXPORT_MEDIA_TYPES, export_headers
+from services.compression import UploadTooLarge, export_response, read_upload
+from services.jobs_services import start_import_job
+from services.versions_services import get_conditional
 
 
 router = APIRouter(prefix="/products", tags=["products"])
 
 
 @router.get("/", response_model=list[ProductOut])
-def get_products(db: Session = Depends(get_db)):
-    return list_products(db)
+async def get_products(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = Query(default=None),
+    category_id: int | None = Query(default=None),
+    brand: str | None = Query(default=None),
+    name: str | None = Query(default=None),
+    order: Literal["id", "price", "-price"] = Query(default="id"),
+    min_price: Decimal | None = Query(default=None, ge=0),
+    max_price: Decimal | None = Query(default=None, ge=0),
+    fast: bool = Query(default=False),
+    db: AsyncSession = Depends(get_db),
+):
+    headers, not_modified = await get_conditional(db, request, "products")
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    try:
+        products, next_cursor = await list_products(
+            db,
+            limit=limit,
+            cursor=cursor,
+            category_id=category_id,
+            brand=brand,
+            name=name,
+            order=order,
+            min_price=min_price,
+            max_price=max_price,
+            columns=PRODUCT_ROW_COLUMNS if fast else None,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if fast:
+        return rows_response(products, headers)
+    response.headers.update(headers)
+    return products
+
+
+@router.get("/search", response_model=list[ProductSearchItem])
+async def search_products_endpoint(
+    q: str = Query(min_length=2, max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+    category_id: int | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    return rows_response(await search_products(db, q, limit, category_id))
+
 
 @router.post("/", response_model=ApiResponse[ProductOut])
-def create_product_endpoint(payload: ProductCreate, db: Session = Depends(get_db)):
-    product = create_product(db, payload)
+async def create_product_endpoint(payload: ProductCreate, db: AsyncSession = Depends(get_db)):
+    product = await create_product(db, payload)
     return ApiResponse(success=True, message="Produto criado", data=product)
 
 @router.put("/{product_id}", response_model=ProductOut)
-def edit_product_endpoint(product_id: int, payload: ProductUpdate, db: Session = Depends(get_db)):
-    return edit_product(db, product_id, payload)
+async def edit_product_endpoint(product_id: int, payload: ProductUpdate, db: AsyncSession = Depends(get_db)):
+    return await edit_product(db, product_id, payload)
 
 
 @router.delete("/{product_id}", response_model=ApiResponse[ProductOut])
-def delete_product_endpoint(product_id: int, db: Session = Depends(get_db)):
-    product = delete_product(db, product_id)
+async def delete_product_endpoint(product_id: int, db: AsyncSession = Depends(get_db)):
+    product = await delete_product(db, product_id)
     if not product:
         return ApiResponse(success=False, message="Produto nao encontrado")
     return ApiResponse(success=True, message="Produto removido", data=product)
 
 
+@router.post("/bulk-delete", response_model=ApiResponse)
+async def bulk_delete_products_endpoint(
+    payload: ProductBulkDelete, db: AsyncSession = Depends(get_db)
+):
+    products = await delete_products(db, payload.ids)
+    deleted_ids = sorted(product.id for product in products)
+    return ApiResponse(
+        success=True,
+        message="Produtos removidos",
+        data={"deleted": len(deleted_ids), "ids": deleted_ids},
+    )
+
+
 @router.post("/upload", response_model=ApiResponse)
 async def upload_products_csv(
-    file: UploadFile = File(...), db: Session = Depends(get_db)
+    response: Response,
+    file: UploadFile = File(...),
+    background: bool = Query(default=False),
+    db: AsyncSession = Depends(get_db),
 ):
-    contents = await file.read()
-    result = import_products_from_csv(db, contents)
+    try:
+        contents = await read_upload(file)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if background:
+        job = await start_import_job(db, "products", import_products_from_csv, contents)
+        response.status_code = 202
+        return ApiResponse(
+            success=True, message="Importacao agendada", data={"job_id": job.id}
+        )
+    result = await import_products_from_csv(db, contents)
     if result["errors"]:
         return ApiResponse(success=False, message="CSV invalido", data=result)
     return ApiResponse(success=True, message="Importacao concluida", data=result)
 
-
 @router.get("/csv")
-def export_products_csv(db: Session = Depends(get_db)):
-    products = list_products(db)
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["id", "name", "description", "price", "category_id", "brand"])
-    for product in products:
-        writer.writerow(
-            [
-                product.id,
-                product.name,
-                product.description,
-                product.price,
-                product.category_id,
-                product.brand,
-            ]
-        )
-    output.seek(0)
-    headers = {"Content-Disposition": "attachment; filename=products.csv"}
-    return StreamingResponse(output, media_type="text/csv", headers=headers)
+def export_products_csv(
+    request: Request,
+    format: Literal["csv", "parquet", "arrow"] = Query(default="csv"),
+):
+    return export_response(
+        request,
+        iter_products_export(format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=export_headers("products", format),
+        compress=format != "parquet",
+    )
@@ -1,77 +1,189 @@
-import csv
-import io
+from datetime import date, datetime, timezone
+from functools import partial
+from typing import Literal
 
-from fastapi import APIRouter, Depends, File, UploadFile, Query
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from db import get_db
-from models import Sale
-from schemas import ApiResponse, MonthlySalesOut, MonthlySalesUpdate, SalesSummaryItem
+from schemas import (
+    ApiResponse,
+    MonthlySalesBulk,
+    MonthlySalesOut,
+    MonthlySalesUpdate,
+    SalesComparisonItem,
+    SalesSummaryItem,
+)
 from services.sales_services import (
+    SALES_TABLES,
+    import_monthly_sales_from_csv,
     import_sales_from_csv,
+    iter_sales_export,
+    sales_comparison,
     sales_summary,
     sales_years,
+    summary_cache,
     upsert_monthly_sales,
+    upload_sales_source,
+    upsert_monthly_sales_bulk,
+)
+from services.arrow_io import EXPORT_MEDIA_TYPES, export_headers
+from services.compression import UploadTooLarge, export_response, read_upload
+from services.jobs_services import start_import_job
+from services.versions_services import (
+    conditional_headers,
+    read_table_versions,
+    version_key,
 )
 
 router = APIRouter(prefix="/sales", tags=["sales"])
 
 
 @router.get("/summary", response_model=list[SalesSummaryItem])
-def get_sales_summary(
-    year: int | None = Query(default=None), db: Session = Depends(get_db)
+async def get_sales_summary(
+    request: Request,
+    response: Response,
+    year: int | None = Query(default=None),
+    start: date | None = Query(default=None),
+    end: date | None = Query(default=None),
+    granularity: Literal["day", "week", "month", "quarter"] | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    versions = await read_table_versions(db, *SALES_TABLES)
+    headers, not_modified = conditional_headers(request, versions)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return await sales_summary(
+        db, year, start, end, granularity, versions=version_key(versions)
+    )
+
+
+@router.get("/summary/compare", response_model=list[SalesComparisonItem])
+async def get_sales_comparison(
+    request: Request,
+    response: Response,
+    years: list[int] = Query(default=[]),
+    start_year: int | None = Query(default=None),
+    end_year: int | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
 ):
-    return sales_summary(db, year)
+    selected = set(years)
+    if (start_year is None) != (end_year is None):
+        raise HTTPException(
+            status_code=400, detail="Informe start_year e end_year juntos"
+        )
+    if start_year is not None:
+        if end_year < start_year or end_year - start_year > 100:
+            raise HTTPException(status_code=400, detail="Intervalo de anos invalido")
+        selected.update(range(start_year, end_year + 1))
+    versions = await read_table_versions(db, *SALES_TABLES)
+    headers, not_modified = conditional_headers(request, versions)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return await sales_comparison(db, sorted(selected), versions=version_key(versions))
 
 
 @router.get("/years", response_model=list[int])
-def get_sales_years(db: Session = Depends(get_db)):
-    return sales_years(db)
+async def get_sales_years(
+    request: Request, response: Response, db: AsyncSession = Depends(get_db)
+):
+    versions = await read_table_versions(db, *SALES_TABLES)
+    headers, not_modified = conditional_headers(request, versions)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return await sales_years(db, versions=version_key(versions))
+
+
+@router.get("/cache")
+async def get_sales_cache_stats():
+    return summary_cache.stats()
 
 
 @router.post("/upload", response_model=ApiResponse)
-async def upload_sales_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    contents = await file.read()
-    result = import_sales_from_csv(db, contents)
+async def upload_sales_csv(
+    response: Response,
+    file: UploadFile = File(...),
+    background: bool = Query(default=False),
+    source: str | None = Query(default=None, min_length=1, max_length=100),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        contents = await read_upload(file)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    importer = partial(
+        import_sales_from_csv, source=source or upload_sales_source(file.filename)
+    )
+    if background:
+        job = await start_import_job(db, "sales", importer, contents)
+        response.status_code = 202
+        return ApiResponse(
+            success=True, message="Importacao agendada", data={"job_id": job.id}
+        )
+    result = await importer(db, contents)
     if result["errors"]:
         return ApiResponse(success=False, message="CSV invalido", data=result)
     return ApiResponse(success=True, message="Importacao concluida", data=result)
 
-
 @router.get("/csv")
 def export_sales_csv(
-    year: int | None = Query(default=None), db: Session = Depends(get_db)
+    request: Request,
+    year: int | None = Query(default=None),
+    start: date | None = Query(default=None),
+    end: date | None = Query(default=None),
+    format: Literal["csv", "parquet", "arrow"] = Query(default="csv"),
 ):
-    query = db.query(Sale)
-    if year:
-        query = query.filter(func.extract("year", Sale.date) == year)
-    rows = query.order_by(Sale.id).all()
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["id", "product_id", "quantity", "total_price", "date"])
-    for row in rows:
-        writer.writerow(
-            [
-                row.id,
-                row.product_id,
-                row.quantity,
-                f"{row.total_price / 100:.2f}",
-                row.date.isoformat() if row.date else "",
-            ]
-        )
-    output.seek(0)
-    headers = {"Content-Disposition": "attachment; filename=sales.csv"}
-    return StreamingResponse(output, media_type="text/csv", headers=headers)
+    return export_response(
+        request,
+        iter_sales_export(year, start, end, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        # A distinct name per export keeps a re-imported export (whose ids are
+        # the database keys) out of the id space of the original upload.
+        headers=export_headers(
+            f"sales-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}", format
+        ),
+        compress=format != "parquet",
+    )
 
 
 @router.put("/override/{year}/{month}", response_model=MonthlySalesOut)
-def upsert_sales_override(
+async def upsert_sales_override(
     year: int,
     month: int,
     payload: MonthlySalesUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+):
+    return await upsert_monthly_sales(db, year, month, payload.quantity, payload.total_price)
+
+
+@router.post("/override", response_model=ApiResponse)
+async def upsert_sales_overrides(
+    payload: MonthlySalesBulk,
+    db: AsyncSession = Depends(get_db),
 ):
-    return upsert_monthly_sales(db, year, month, payload.quantity, payload.total_price)
+    result = await upsert_monthly_sales_bulk(db, payload.entries)
+    if result["errors"]:
+        return ApiResponse(success=False, message="Dados invalidos", data=result)
+    return ApiResponse(success=True, message="Ajustes salvos", data=result)
+
+
+@router.post("/override/upload", response_model=ApiResponse)
+async def upload_sales_overrides_csv(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        contents = await read_upload(file)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    result = await import_monthly_sales_from_csv(db, contents)
+    if result["errors"]:
+        return ApiResponse(success=False, message="CSV invalido", data=result)
+    return ApiResponse(success=True, message="Importacao concluida", data=result)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from db import get_pool_stats
+from metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
+
+router = APIRouter(tags=["system"])
+
+
+@router.get("/db/pool")
+async def get_db_pool_stats():
+    return get_pool_stats()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
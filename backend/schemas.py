@@ -1,5 +1,9 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Generic, TypeVar, Optional
+from datetime import date, datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Generic, TypeVar, Optional
+
+from models import MAX_PRODUCT_PRICE
 
 T = TypeVar("T")
 
@@ -14,26 +18,33 @@ class ProductCreate(BaseModel):
     name: str
     description: str
     category_id: int
-    price: float
+    price: float = Field(allow_inf_nan=False, ge=0, lt=MAX_PRODUCT_PRICE)
     brand: str
 
 class ProductUpdate(BaseModel):
     name: str
     description: str
     category_id: int
-    price: float
+    price: float = Field(allow_inf_nan=False, ge=0, lt=MAX_PRODUCT_PRICE)
     brand: str
 
+class ProductBulkDelete(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=10000)
+
 class ProductOut(BaseModel):
     id: int
     name: str
     description: str
     category_id: int
-    price: float | str
+    price: float
     brand: str
 
     model_config = ConfigDict(from_attributes=True)
 
+
+class ProductSearchItem(ProductOut):
+    rank: float
+
 ## Categories
 
 class CategoryCreate(BaseModel):
@@ -55,11 +66,30 @@ class SalesSummaryItem(BaseModel):
     quantity: int
     total_price: float
     profit_variation: float
+    period: Optional[date] = None
 
 
-class MonthlySalesUpdate(BaseModel):
+class SalesComparisonItem(BaseModel):
+    year: int
+    month: int
     quantity: int
     total_price: float
+    profit_variation: float
+    yoy_variation: Optional[float] = None
+
+
+class MonthlySalesUpdate(BaseModel):
+    quantity: int
+    total_price: float = Field(allow_inf_nan=False)
+
+
+class MonthlySalesEntry(MonthlySalesUpdate):
+    year: int
+    month: int
+
+
+class MonthlySalesBulk(BaseModel):
+    entries: list[MonthlySalesEntry] = Field(min_length=1, max_length=10000)
 
 
 class MonthlySalesOut(BaseModel):
@@ -69,3 +99,60 @@ class MonthlySalesOut(BaseModel):
     total_price: float
 
     model_config = ConfigDict(from_attributes=True)
+
+
+## Analytics
+
+class ProductRevenueItem(BaseModel):
+    rank: int
+    product_id: int
+    name: str
+    brand: str
+    category_id: int
+    category: str
+    quantity: int
+    revenue: float
+    share: float
+
+
+class CategoryRevenueItem(BaseModel):
+    rank: int
+    category_id: int
+    category: str
+    quantity: int
+    revenue: float
+    share: float
+
+
+class BrandRevenueItem(BaseModel):
+    rank: int
+    brand: str
+    quantity: int
+    revenue: float
+    share: float
+
+
+class MonthShareItem(BaseModel):
+    year: int
+    month: int
+    rank: int
+    key: int | str
+    label: str
+    quantity: int
+    revenue: float
+    share: float
+
+## Jobs
+
+class ImportJobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    rows_parsed: int
+    rows_inserted: int
+    error_count: int
+    result: Optional[dict[str, Any]] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
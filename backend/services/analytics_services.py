@@ -0,0 +1,96 @@
+from sqlalchemy import Integer, Numeric, func, select
+
+from models import Category, Product, Sale
+from services.sales_services import filter_sales_dates, sales_date_range
+
+
+def _revenue_columns(partition_by=None):
+    revenue = func.sum(Sale.total_price)
+    return (
+        func.sum(Sale.quantity).label("quantity"),
+        (revenue.cast(Numeric) / 100).label("revenue"),
+        func.coalesce(
+            func.round(
+                revenue.cast(Numeric)
+                / func.nullif(func.sum(revenue).over(partition_by=partition_by), 0),
+                4,
+            ),
+            0,
+        ).label("share"),
+        func.rank().over(partition_by=partition_by, order_by=revenue.desc()).label("rank"),
+    )
+
+
+def _sales_with_products(query, year=None, start=None, end=None):
+    query = query.select_from(Sale).join(Product, Product.id == Sale.product_id)
+    return filter_sales_dates(query, *sales_date_range(year, start, end))
+
+
+async def top_products(db, limit=10, year=None, start=None, end=None):
+    query = select(
+        Product.id.label("product_id"),
+        Product.name,
+        Product.brand,
+        Category.id.label("category_id"),
+        Category.name.label("category"),
+        *_revenue_columns(),
+    )
+    query = _sales_with_products(query, year, start, end)
+    query = (
+        query.join(Category, Category.id == Product.category_id)
+        .group_by(Product.id, Category.id)
+        .order_by("rank", Product.id)
+        .limit(limit)
+    )
+    return (await db.execute(query)).mappings().all()
+
+
+async def revenue_by_category(db, year=None, start=None, end=None):
+    query = select(
+        Category.id.label("category_id"),
+        Category.name.label("category"),
+        *_revenue_columns(),
+    )
+    query = _sales_with_products(query, year, start, end)
+    query = (
+        query.join(Category, Category.id == Product.category_id)
+        .group_by(Category.id)
+        .order_by("rank", Category.id)
+    )
+    return (await db.execute(query)).mappings().all()
+
+
+async def revenue_by_brand(db, year=None, start=None, end=None):
+    query = select(Product.brand, *_revenue_columns())
+    query = _sales_with_products(query, year, start, end)
+    query = query.group_by(Product.brand).order_by("rank", Product.brand)
+    return (await db.execute(query)).mappings().all()
+
+
+async def month_share(db, by="product", limit=5, year=None, start=None, end=None):
+    if by == "category":
+        key, label = Category.id, Category.name
+    elif by == "brand":
+        key, label = Product.brand, Product.brand
+    else:
+        key, label = Product.id, Product.name
+
+    sale_year = func.extract("year", Sale.date).cast(Integer)
+    ranked = select(
+        sale_year.label("year"),
+        Sale.month,
+        key.label("key"),
+        label.label("label"),
+        *_revenue_columns(partition_by=[sale_year, Sale.month]),
+    )
+    ranked = _sales_with_products(ranked, year, start, end).where(Sale.date.isnot(None))
+    if by == "category":
+        ranked = ranked.join(Category, Category.id == Product.category_id)
+    ranked = ranked.group_by(sale_year, Sale.month, key, label).subquery()
+
+    query = (
+        select(ranked)
+        .where(ranked.c.rank <= limit)
+        .order_by(ranked.c.year, ranked.c.month, ranked.c.rank, ranked.c.key)
+    )
+    return (await db.execute(query)).mappings().all()
@@ -0,0 +1,208 @@
+import io
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+EXPORT_FORMATS = ("csv", "parquet", "arrow")
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+EXPORT_EXTENSIONS = {"csv": "csv", "parquet": "parquet", "arrow": "arrows"}
+COLUMNAR_BATCH_SIZE = 64 * 1024
+PARQUET_MAGIC = b"PAR1"
+
+PRODUCT_SCHEMA = pa.schema(
+    [
+        ("id", pa.int32()),
+        ("name", pa.string()),
+        ("description", pa.string()),
+        ("price", pa.decimal128(12, 2)),
+        ("category_id", pa.int32()),
+        ("brand", pa.string()),
+    ]
+)
+SALE_SCHEMA = pa.schema(
+    [
+        ("id", pa.int32()),
+        ("product_id", pa.int32()),
+        ("quantity", pa.int32()),
+        ("total_price", pa.decimal128(12, 2)),
+        ("date", pa.date32()),
+    ]
+)
+SALE_UPLOAD_COLUMNS = ("product_id", "quantity", "total_price", "date")
+MAX_INTEGER = 2**31 - 1  # sales columns are INTEGER
+
+
+def export_headers(name, export_format):
+    return {
+        "Content-Disposition": (
+            f"attachment; filename={name}.{EXPORT_EXTENSIONS[export_format]}"
+        )
+    }
+
+
+def cents_to_decimal(cents):
+    scaled = pc.multiply(
+        pc.cast(cents, pa.decimal128(19, 0)),
+        pa.scalar(Decimal("0.01"), pa.decimal128(3, 2)),
+    )
+    return pc.cast(scaled, pa.decimal128(12, 2))
+
+
+class _ChunkSink(io.RawIOBase):
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def stream_columnar_chunks(schema, result, export_format, convert=None):
+    """Write each cursor partition as one Parquet row group or Arrow IPC batch.
+
+    ``convert`` may replace the raw column arrays built from the DB rows, e.g.
+    to turn integer cents into decimals without formatting each value.
+    """
+    sink = _ChunkSink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    async for rows in result.partitions(COLUMNAR_BATCH_SIZE):
+        columns = dict(zip(schema.names, zip(*rows)))
+        if convert is not None:
+            columns = convert(columns)
+        arrays = [
+            column if isinstance(column, pa.Array) else pa.array(column, field.type)
+            for column, field in zip(columns.values(), schema)
+        ]
+        writer.write_batch(pa.record_batch(arrays, schema=schema))
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+def is_parquet(file_contents: bytes):
+    return file_contents[:4] == PARQUET_MAGIC
+
+
+def _required_value(column):
+    if pa.types.is_integer(column.type):
+        return pc.fill_null(pc.not_equal(column, 0), False)
+    return pc.is_valid(column)
+
+
+def _fits_integer(column):
+    # Nulls are left to _required_value.
+    return pc.fill_null(pc.less_equal(pc.abs(column), MAX_INTEGER), True)
+
+
+def _sales_batch_payload(batch, records_before):
+    table = pa.Table.from_batches([batch])
+    try:
+        product_id = pc.cast(table["product_id"], pa.int64())
+        quantity = pc.cast(table["quantity"], pa.int64())
+        date = pc.cast(table["date"], pa.date32(), safe=False)
+        total_price = pc.fill_null(pc.cast(table["total_price"], pa.float64()), 0.0)
+        source_id = (
+            pc.cast(table["id"], pa.int64())
+            if "id" in table.column_names
+            else pa.nulls(len(table), pa.int64())
+        )
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as exc:
+        return b"", 0, [{"row": 0, "error": f"Dados invalidos: {exc}"}]
+
+    present = pc.and_(
+        pc.and_(_required_value(product_id), _required_value(quantity)),
+        _required_value(date),
+    )
+    in_range = pc.and_(
+        pc.and_(_fits_integer(product_id), _fits_integer(quantity)),
+        pc.and_(
+            pc.is_finite(total_price),
+            _fits_integer(pc.abs(pc.multiply(total_price, 100.0))),
+        ),
+    )
+    valid = pc.and_(present, in_range)
+    errors = [
+        {
+            "row": records_before + index + 1,
+            "error": "Campos obrigatorios ausentes"
+            if not is_present
+            else "Dados invalidos: valor fora do limite",
+        }
+        for index, is_present in zip(
+            pc.indices_nonzero(pc.invert(valid)).to_pylist(),
+            pc.filter(present, pc.invert(valid)).to_pylist(),
+        )
+    ]
+
+    date = pc.filter(date, valid)
+    staged = pa.table(
+        {
+            "product_id": pc.filter(product_id, valid),
+            "month": pc.month(date),
+            "quantity": pc.filter(quantity, valid),
+            "total_price": pc.cast(
+                pc.round(pc.multiply(pc.filter(total_price, valid), 100.0)),
+                pa.int64(),
+            ),
+            "date": date,
+            "source_id": pc.filter(source_id, valid),
+        }
+    )
+    output = io.BytesIO()
+    pa_csv.write_csv(staged, output, pa_csv.WriteOptions(include_header=False))
+    return output.getvalue(), len(staged), errors
+
+
+def iter_parquet_sales_batches(file_contents: bytes, batch_size=COLUMNAR_BATCH_SIZE):
+    """Yield ``(csv_payload, staged, errors)`` per Parquet batch, like the CSV chunks.
+
+    Columns are converted with Arrow compute kernels; rows are numbered from 1
+    in file order so errors read the same as for a CSV upload.
+    """
+    try:
+        parquet_file = pq.ParquetFile(pa.BufferReader(file_contents))
+    except pa.ArrowException as exc:
+        yield b"", 0, [{"row": 0, "error": f"Parquet invalido: {exc}"}]
+        return
+
+    missing = [
+        name for name in SALE_UPLOAD_COLUMNS if name not in parquet_file.schema_arrow.names
+    ]
+    if missing:
+        yield b"", 0, [{"row": 0, "error": f"Colunas ausentes: {', '.join(missing)}"}]
+        return
+
+    columns = [
+        name
+        for name in ("id", *SALE_UPLOAD_COLUMNS)
+        if name in parquet_file.schema_arrow.names
+    ]
+    records_before = 0
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        yield _sales_batch_payload(batch, records_before)
+        records_before += batch.num_rows
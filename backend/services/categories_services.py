@@ -1,43 +1,53 @@
+import asyncio
 import csv
 import io
 
-from sqlalchemy import func
+from sqlalchemy import String, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.exc import IntegrityError
 
 from models import Category
+from services.versions_services import bump_table_versions
 
-def list_categories(db):
-    return db.query(Category).all()
+async def list_categories(db):
+    return (await db.scalars(select(Category))).all()
 
-def create_category(db, data):
-    name = data.name.strip()
-    exists = (
-        db.query(Category)
-        .filter(func.lower(Category.name) == name.lower())
-        .first()
-    )
-    if exists:
-        return None
+async def list_category_rows(db):
+    return (await db.execute(select(Category.id, Category.name))).all()
 
-    category = Category(name=name)
-    db.add(category)
-    db.commit()
-    db.refresh(category)
+async def create_category(db, data):
+    name = data.name.strip()
+    category = (
+        await db.scalars(
+            insert(Category)
+            .values(name=name)
+            .on_conflict_do_nothing(index_elements=[func.lower(Category.name)])
+            .returning(Category)
+        )
+    ).first()
+    if category:
+        await bump_table_versions(db, "categories")
+    await db.commit()
     return category
 
-def edit_category(db, category_id, data):
-    category = db.query(Category).filter(Category.id == category_id).first()
+async def edit_category(db, category_id, data):
+    category = await db.get(Category, category_id)
     if not category:
         return None
     
     category.name = data.name
+    await bump_table_versions(db, "categories")
 
-    db.commit()
-    db.refresh(category)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return None
+    await db.refresh(category)
     return category
 
 
-def import_categories_from_csv(db, file_contents: bytes):
+def _parse_categories_csv(file_contents: bytes):
     decoded = file_contents.decode("utf-8")
     reader = csv.DictReader(io.StringIO(decoded))
     fieldnames = [name.strip() for name in (reader.fieldnames or [])]
@@ -45,16 +55,9 @@ def import_categories_from_csv(db, file_contents: bytes):
     if not fieldnames or "name" not in fieldnames or any(
         field not in allowed_fields for field in fieldnames
     ):
-        return {
-            "created": 0,
-            "skipped": 0,
-            "errors": [
-                {"row": 0, "error": "CSV invalido: colunas esperadas id,name"}
-            ],
-        }
+        return {}, [{"row": 0, "error": "CSV invalido: colunas esperadas id,name"}]
     errors = []
-    names_seen = set()
-    categories = []
+    rows_by_name = {}
 
     for index, row in enumerate(reader, start=1):
         try:
@@ -64,37 +67,65 @@ def import_categories_from_csv(db, file_contents: bytes):
                 continue
 
             name_key = name.lower()
-            if name_key in names_seen:
+            if name_key in rows_by_name:
                 errors.append({"row": index, "error": "Nome duplicado no CSV"})
                 continue
-            names_seen.add(name_key)
-
-            exists = (
-                db.query(Category)
-                .filter(func.lower(Category.name) == name.lower())
-                .first()
-            )
-            if exists:
-                errors.append({"row": index, "error": "Categoria duplicada"})
-                continue
-
-            categories.append(Category(name=name))
+            rows_by_name[name_key] = (index, name)
         except (ValueError, TypeError) as exc:
             errors.append({"row": index, "error": f"Dados invalidos: {exc}"})
 
+    return rows_by_name, errors
+
+
+async def import_categories_from_csv(db, file_contents: bytes, progress=None):
+    rows_by_name, errors = await asyncio.to_thread(
+        _parse_categories_csv, file_contents
+    )
+    if progress:
+        await progress(len(rows_by_name) + len(errors), len(errors))
+    if errors and errors[0]["row"] == 0:
+        return {"created": 0, "skipped": 0, "errors": errors}
+
+    if rows_by_name:
+        # One array parameter: asyncpg caps a statement at 32767 bind arguments.
+        names = bindparam("names", list(rows_by_name), type_=ARRAY(String))
+        existing = (
+            await db.scalars(
+                select(func.lower(Category.name)).where(
+                    func.lower(Category.name) == any_(names)
+                )
+            )
+        ).all()
+        for name_key in existing:
+            index, _ = rows_by_name[name_key]
+            errors.append({"row": index, "error": "Categoria duplicada"})
+        errors.sort(key=lambda item: item["row"])
+
     if errors:
         return {"created": 0, "skipped": 0, "errors": errors}
 
+    categories = [{"name": name} for _, name in rows_by_name.values()]
+    if not categories:
+        return {"created": 0, "skipped": 0, "errors": []}
+
     try:
-        db.add_all(categories)
-        db.commit()
-        created = len(categories)
+        inserted = (
+            await db.execute(
+                insert(Category)
+                .on_conflict_do_nothing(index_elements=[func.lower(Category.name)])
+                .returning(Category.id),
+                categories,
+            )
+        ).all()
+        await bump_table_versions(db, "categories")
+        await db.commit()
+        created = len(inserted)
     except IntegrityError as exc:
-        db.rollback()
+        await db.rollback()
         return {
             "created": 0,
             "skipped": 0,
             "errors": [{"row": 0, "error": f"Duplicado ou violacao: {exc.orig}"}],
         }
 
-    return {"created": created, "skipped": 0, "errors": []}
+    return {"created": created, "skipped": len(categories) - created, "errors": []}
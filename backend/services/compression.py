@@ -0,0 +1,136 @@
+import asyncio
+import gzip
+import os
+import zlib
+
+import zstandard
+from fastapi.responses import StreamingResponse
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+DECOMPRESS_READ_SIZE = 1024 * 1024
+# A zstd block can expand ~32000x, so input is fed in slices to bound each output.
+ZSTD_INPUT_SLICE = 1024
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(1024 * 1024 * 1024)))
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+
+
+class InvalidCompressedUpload(ValueError):
+    pass
+
+
+class UploadTooLarge(Exception):
+    def __init__(self):
+        super().__init__(f"Arquivo maior que o limite de {UPLOAD_MAX_BYTES} bytes")
+
+
+def upload_encoding(head: bytes):
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def _zstd_chunks(fileobj):
+    decompressor = zstandard.ZstdDecompressor()
+    frame = decompressor.decompressobj()
+    in_frame = False
+    while data := fileobj.read(DECOMPRESS_READ_SIZE):
+        view = memoryview(data)
+        while view:
+            in_frame = True
+            yield frame.decompress(view[:ZSTD_INPUT_SLICE])
+            view = view[ZSTD_INPUT_SLICE:]
+            if frame.eof:
+                view = memoryview(frame.unused_data + view)
+                frame = decompressor.decompressobj()
+                in_frame = False
+    if in_frame:
+        raise zstandard.ZstdError("fim inesperado do arquivo")
+
+
+def _gzip_chunks(fileobj):
+    reader = gzip.GzipFile(fileobj=fileobj, mode="rb")
+    while chunk := reader.read(DECOMPRESS_READ_SIZE):
+        yield chunk
+
+
+def _decompress_file(fileobj, encoding):
+    chunks = _gzip_chunks(fileobj) if encoding == "gzip" else _zstd_chunks(fileobj)
+    contents = bytearray()
+    try:
+        for chunk in chunks:
+            contents += chunk
+            if len(contents) > UPLOAD_MAX_BYTES:
+                raise UploadTooLarge()
+    except (OSError, EOFError, zlib.error, zstandard.ZstdError) as exc:
+        raise InvalidCompressedUpload(f"Arquivo {encoding} invalido: {exc}") from exc
+    return contents
+
+
+async def read_upload(file):
+    """Read an ``UploadFile``, inflating gzip or zstd content detected by magic bytes.
+
+    The spooled upload is decompressed 1 MiB at a time in a worker thread, so the
+    compressed and decompressed copies are never both held in memory. Raises
+    ``UploadTooLarge`` once the content passes ``UPLOAD_MAX_BYTES``.
+    """
+    head = await file.read(4)
+    encoding = upload_encoding(head)
+    if encoding is None:
+        if file.size is not None and file.size > UPLOAD_MAX_BYTES:
+            raise UploadTooLarge()
+        return head + await file.read()
+    await file.seek(0)
+    return await asyncio.to_thread(_decompress_file, file.file, encoding)
+
+
+def negotiate_encoding(accept_encoding):
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        name, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        offered[name.strip().lower()] = quality
+    # Highest q wins; on a tie zstd is preferred over gzip.
+    candidates = [
+        (offered.get(encoding, offered.get("*", 0.0)), -index, encoding)
+        for index, encoding in enumerate(("zstd", "gzip"))
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+def _compressor(encoding):
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+async def compress_stream(chunks, encoding):
+    compressor = _compressor(encoding)
+    async for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if compressed := compressor.compress(chunk):
+            yield compressed
+    yield compressor.flush()
+
+
+def export_response(request, chunks, media_type, headers, compress=True):
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    encoding = (
+        negotiate_encoding(request.headers.get("accept-encoding")) if compress else None
+    )
+    if encoding:
+        chunks = compress_stream(chunks, encoding)
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
@@ -0,0 +1,22 @@
+import csv
+import io
+
+from metrics import add_rows
+
+EXPORT_BATCH_SIZE = 5000
+CSV_CHUNK_SIZE = 64 * 1024
+
+
+async def stream_csv_chunks(header, result, format_row=None, chunk_size=CSV_CHUNK_SIZE):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    async for rows in result.partitions(EXPORT_BATCH_SIZE):
+        add_rows(len(rows))
+        writer.writerows(rows if format_row is None else map(format_row, rows))
+        if output.tell() >= chunk_size:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    if output.tell():
+        yield output.getvalue()
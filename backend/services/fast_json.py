@@ -0,0 +1,15 @@
+import orjson
+from fastapi import Response
+
+
+def encode_rows(rows) -> bytes:
+    if not rows:
+        return b"[]"
+    keys = rows[0]._fields
+    return orjson.dumps([dict(zip(keys, row)) for row in rows])
+
+
+def rows_response(rows, headers=None):
+    return Response(
+        content=encode_rows(rows), media_type="application/json", headers=headers
+    )
@@ -0,0 +1,90 @@
+import asyncio
+import contextvars
+import os
+
+from sqlalchemy import update
+
+from db import SessionLocal
+from models import ImportJob
+
+IMPORT_JOB_WORKERS = int(os.getenv("IMPORT_JOB_WORKERS", "2"))
+INTERRUPTED_JOB_RESULT = {
+    "created": 0,
+    "skipped": 0,
+    "errors": [{"row": 0, "error": "Importacao interrompida pelo reinicio do servidor"}],
+}
+
+_job_slots = asyncio.Semaphore(IMPORT_JOB_WORKERS)
+_running_jobs = set()
+
+
+async def _update_job(job_id, **values):
+    async with SessionLocal() as db:
+        await db.execute(update(ImportJob).where(ImportJob.id == job_id).values(**values))
+        await db.commit()
+
+
+class JobProgress:
+    def __init__(self, job_id):
+        self.job_id = job_id
+
+    async def __call__(self, rows_parsed, error_count=0):
+        await _update_job(self.job_id, rows_parsed=rows_parsed, error_count=error_count)
+
+
+async def fail_interrupted_jobs():
+    # Jobs run inside the API process: any still pending or running when it
+    # starts were cut off by a restart or crash and will never finish.
+    async with SessionLocal() as db:
+        await db.execute(
+            update(ImportJob)
+            .where(ImportJob.status.in_(("pending", "running")))
+            .values(
+                status="failed",
+                error_count=1,
+                result=INTERRUPTED_JOB_RESULT,
+            )
+        )
+        await db.commit()
+
+
+async def get_job(db, job_id):
+    return await db.get(ImportJob, job_id)
+
+
+async def _run_job(job_id, importer, file_contents):
+    async with _job_slots:
+        await _update_job(job_id, status="running")
+        try:
+            async with SessionLocal() as db:
+                result = await importer(
+                    db, file_contents, progress=JobProgress(job_id)
+                )
+        except Exception as exc:
+            result = {
+                "created": 0,
+                "skipped": 0,
+                "errors": [{"row": 0, "error": f"Falha na importacao: {exc}"}],
+            }
+        await _update_job(
+            job_id,
+            status="failed" if result["errors"] else "succeeded",
+            rows_inserted=result["created"],
+            error_count=len(result["errors"]),
+            result=result,
+        )
+
+
+async def start_import_job(db, kind, importer, file_contents: bytes):
+    job = ImportJob(kind=kind)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    # A fresh context keeps the job's queries out of the request's metrics.
+    task = asyncio.create_task(
+        _run_job(job.id, importer, file_contents), context=contextvars.Context()
+    )
+    _running_jobs.add(task)
+    task.add_done_callback(_running_jobs.discard)
+    return job
@@ -1,55 +1,228 @@
+import asyncio
+import base64
+import binascii
 import csv
 import io
+import math
+from decimal import Decimal, InvalidOperation
 
+from sqlalchemy import Float, delete, func, literal, or_, select, tuple_
 from sqlalchemy.exc import IntegrityError
 
-from models import Product, Sale
+from db import SessionLocal
+from models import MAX_PRODUCT_PRICE, Product
+from services.arrow_io import PRODUCT_SCHEMA, stream_columnar_chunks
+from services.csv_export import EXPORT_BATCH_SIZE, stream_csv_chunks
+from services.rollup_services import remove_product_sales_from_rollup
+from services.sales_services import invalidate_sales_cache
+from services.versions_services import bump_table_versions
 
 
-def list_products(db):
-    return db.query(Product).all()
+PRODUCT_ORDERS = ("id", "price", "-price")
 
-def create_product(db, data):
+PRODUCT_ROW_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.description,
+    Product.category_id,
+    Product.price.cast(Float).label("price"),
+    Product.brand,
+)
+
+
+def _name_prefix_pattern(name: str) -> str:
+    escaped = (
+        name.strip()
+        .lower()
+        .replace("\\", "\\\\")
+        .replace("%", "\\%")
+        .replace("_", "\\_")
+    )
+    return f"{escaped}%"
+
+
+SEARCH_FIELDS = ((Product.name, 1.0), (Product.brand, 0.8), (Product.description, 0.5))
+
+
+async def search_products(db, term, limit=10, category_id=None):
+    # "<%" (word similarity) is served by the gin_trgm_ops index on each field.
+    term = literal(term.strip())
+    rank = func.greatest(
+        *(func.word_similarity(term, column) * weight for column, weight in SEARCH_FIELDS)
+    )
+    query = select(*PRODUCT_ROW_COLUMNS, rank.label("rank")).where(
+        or_(*(term.op("<%")(column) for column, _ in SEARCH_FIELDS))
+    )
+    if category_id is not None:
+        query = query.where(Product.category_id == category_id)
+    query = query.order_by(rank.desc(), Product.id).limit(limit)
+    return (await db.execute(query)).all()
+
+
+def encode_product_cursor(product, order="id"):
+    if order == "id":
+        raw = str(product.id)
+    else:
+        raw = f"{Decimal(str(product.price))}|{product.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_product_cursor(cursor: str, order="id"):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        if order == "id":
+            return int(raw)
+        price_raw, id_raw = raw.split("|", 1)
+        return Decimal(price_raw), int(id_raw)
+    except (ValueError, TypeError, InvalidOperation, binascii.Error) as exc:
+        raise ValueError("Cursor invalido") from exc
+
+
+async def list_products(
+    db,
+    limit=None,
+    cursor=None,
+    category_id=None,
+    brand=None,
+    name=None,
+    order="id",
+    min_price=None,
+    max_price=None,
+    columns=None,
+):
+    if order not in PRODUCT_ORDERS:
+        raise ValueError("Ordem invalida")
+
+    query = select(*columns) if columns else select(Product)
+    if category_id:
+        query = query.where(Product.category_id == category_id)
+    if brand:
+        query = query.where(Product.brand == brand)
+    if name and name.strip():
+        query = query.where(
+            func.lower(Product.name).like(_name_prefix_pattern(name), escape="\\")
+        )
+    if min_price is not None:
+        query = query.where(Product.price >= min_price)
+    if max_price is not None:
+        query = query.where(Product.price <= max_price)
+
+    if order == "id":
+        if cursor:
+            query = query.where(Product.id > decode_product_cursor(cursor, order))
+        query = query.order_by(Product.id)
+    elif order == "price":
+        if cursor:
+            query = query.where(
+                tuple_(Product.price, Product.id) > tuple_(*decode_product_cursor(cursor, order))
+            )
+        query = query.order_by(Product.price, Product.id)
+    else:
+        if cursor:
+            query = query.where(
+                tuple_(Product.price, Product.id) < tuple_(*decode_product_cursor(cursor, order))
+            )
+        query = query.order_by(Product.price.desc(), Product.id.desc())
+
+    fetch = db.execute if columns else db.scalars
+    if limit is None:
+        return (await fetch(query)).all(), None
+
+    products = (await fetch(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = encode_product_cursor(products[-1], order)
+    return products, next_cursor
+
+async def iter_products_export(export_format="csv"):
+    async with SessionLocal() as db:
+        result = await db.stream(
+            select(
+                Product.id,
+                Product.name,
+                Product.description,
+                Product.price,
+                Product.category_id,
+                Product.brand,
+            )
+            .order_by(Product.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        if export_format == "csv":
+            chunks = stream_csv_chunks(
+                ["id", "name", "description", "price", "category_id", "brand"], result
+            )
+        else:
+            chunks = stream_columnar_chunks(PRODUCT_SCHEMA, result, export_format)
+        async for chunk in chunks:
+            yield chunk
+
+async def create_product(db, data):
     product = Product(
         name=data.name, 
         description=data.description, 
         category_id=data.category_id, 
-        price=data.price, 
+        price=Decimal(str(data.price)), 
         brand=data.brand,
     )
     db.add(product)
-    db.commit()
-    db.refresh(product)
+    await bump_table_versions(db, "products")
+    await db.commit()
+    await db.refresh(product)
     return product
 
-def edit_product(db, product_id, data):
-    product = db.query(Product).filter(Product.id == product_id).first()
+async def edit_product(db, product_id, data):
+    product = await db.get(Product, product_id)
     if not product:
         return None
     
     product.name = data.name
     product.description = data.description
     product.category_id = data.category_id
-    product.price = data.price
+    product.price = Decimal(str(data.price))
     product.brand = data.brand
+    await bump_table_versions(db, "products")
 
-    db.commit()
-    db.refresh(product)
+    await db.commit()
+    await db.refresh(product)
     return product
 
 
-def delete_product(db, product_id):
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        return None
+async def delete_products(db, product_ids):
+    locked_ids = (
+        await db.scalars(
+            select(Product.id)
+            .where(Product.id.in_(product_ids))
+            .order_by(Product.id)
+            .with_for_update()
+        )
+    ).all()
+    if not locked_ids:
+        await db.rollback()
+        return []
 
-    db.query(Sale).filter(Sale.product_id == product_id).delete()
-    db.delete(product)
-    db.commit()
-    return product
+    await remove_product_sales_from_rollup(db, locked_ids)
+    products = (
+        await db.scalars(
+            delete(Product)
+            .where(Product.id.in_(locked_ids))
+            .returning(Product)
+            .execution_options(synchronize_session=False)
+        )
+    ).all()
+    await bump_table_versions(db, "products", "sales")
+    await db.commit()
+    invalidate_sales_cache()
+    return products
+
+
+async def delete_product(db, product_id):
+    products = await delete_products(db, [product_id])
+    return products[0] if products else None
 
 
-def import_products_from_csv(db, file_contents: bytes):
+def _parse_products_csv(file_contents: bytes):
     decoded = file_contents.decode("utf-8")
     reader = csv.DictReader(io.StringIO(decoded))
     errors = []
@@ -66,28 +239,40 @@ def import_products_from_csv(db, file_contents: bytes):
             if not name or not description or not brand or not category_id:
                 errors.append({"row": index, "error": "Campos obrigatorios ausentes"})
                 continue
+            if not (math.isfinite(price) and 0 <= round(price, 2) < MAX_PRODUCT_PRICE):
+                errors.append({"row": index, "error": "Dados invalidos: preco fora do limite"})
+                continue
 
             products.append(
                 Product(
                     name=name,
                     description=description,
                     category_id=category_id,
-                    price=price,
+                    price=Decimal(str(price)),
                     brand=brand,
                 )
             )
         except (ValueError, TypeError) as exc:
             errors.append({"row": index, "error": f"Dados invalidos: {exc}"})
 
+    return products, errors
+
+
+async def import_products_from_csv(db, file_contents: bytes, progress=None):
+    products, errors = await asyncio.to_thread(_parse_products_csv, file_contents)
+    if progress:
+        await progress(len(products) + len(errors), len(errors))
+
     if errors:
         return {"created": 0, "skipped": 0, "errors": errors}
 
     try:
         db.add_all(products)
-        db.commit()
+        await bump_table_versions(db, "products")
+        await db.commit()
         created = len(products)
     except IntegrityError as exc:
-        db.rollback()
+        await db.rollback()
         return {
             "created": 0,
             "skipped": 0,
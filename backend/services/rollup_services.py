@@ -0,0 +1,68 @@
+from sqlalchemy import Integer, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from models import Sale, SalesRollup
+from services.versions_services import bump_table_versions
+
+
+def rollup_upsert(rows):
+    stmt = insert(SalesRollup).from_select(
+        ["year", "month", "sales_count", "quantity", "total_price"], rows
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_sales_rollup",
+        set_={
+            "sales_count": SalesRollup.sales_count + stmt.excluded.sales_count,
+            "quantity": SalesRollup.quantity + stmt.excluded.quantity,
+            "total_price": SalesRollup.total_price + stmt.excluded.total_price,
+        },
+    )
+    return stmt
+
+
+async def _upsert_rollup(db, rows):
+    await db.execute(rollup_upsert(rows))
+
+
+def rollup_rows(source, sign=1):
+    # Ordered so concurrent upserts lock the shared (year, month) rows in the
+    # same order instead of deadlocking.
+    year = func.extract("year", source.c.date).cast(Integer)
+    return select(
+        year.label("year"),
+        source.c.month,
+        (func.count() * sign).label("sales_count"),
+        (func.sum(source.c.quantity) * sign).label("quantity"),
+        (func.sum(source.c.total_price) * sign).label("total_price"),
+    ).group_by(year, source.c.month).order_by(year, source.c.month)
+
+
+async def add_sales_to_rollup(db, source):
+    await _upsert_rollup(db, rollup_rows(source))
+
+
+async def remove_sales_from_rollup(db, source):
+    await _upsert_rollup(db, rollup_rows(source, sign=-1))
+
+
+async def remove_product_sales_from_rollup(db, product_ids):
+    source = (
+        select(Sale.date, Sale.month, Sale.quantity, Sale.total_price)
+        .where(Sale.product_id.in_(product_ids))
+        .subquery()
+    )
+    await remove_sales_from_rollup(db, source)
+    await prune_sales_rollup(db)
+
+
+async def prune_sales_rollup(db):
+    await db.execute(delete(SalesRollup).where(SalesRollup.sales_count <= 0))
+
+
+async def rebuild_sales_rollup(db):
+    await db.execute(text("LOCK TABLE sales IN SHARE MODE"))
+    await db.execute(delete(SalesRollup))
+    await add_sales_to_rollup(db, Sale.__table__)
+    await bump_table_versions(db, "sales")
+    await db.commit()
+    return await db.scalar(select(func.count(SalesRollup.id)))
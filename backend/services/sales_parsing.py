@@ -0,0 +1,170 @@
+import asyncio
+import codecs
+import csv
+import io
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Kept free of app imports: worker processes are spawned and import this module alone.
+
+SALES_PARSE_WORKERS = int(os.getenv("SALES_PARSE_WORKERS", str(os.cpu_count() or 1)))
+PARALLEL_PARSE_MIN_BYTES = 64 * 1024 * 1024
+PARSE_CHUNK_BYTES = 16 * 1024 * 1024
+MAX_INTEGER = 2**31 - 1  # sales columns are INTEGER
+
+_parse_pool = None
+
+
+def sales_reader(file_contents: bytes):
+    # utf-8-sig: Excel's "CSV UTF-8" starts with a BOM that would hide the id column.
+    decoded = file_contents.decode("utf-8-sig")
+    raw_lines = io.StringIO(decoded)
+    sniff_reader = csv.reader(raw_lines)
+    header = next(sniff_reader, None)
+    raw_lines.seek(0)
+
+    has_header = bool(header and "product_id" in header)
+    reader = (
+        csv.DictReader(raw_lines)
+        if has_header
+        else csv.reader(raw_lines)
+    )
+    return reader, has_header
+
+
+def parse_sales_rows(reader, has_header, errors):
+    for index, row in enumerate(reader, start=1):
+        try:
+            if has_header:
+                source_id_raw = (row.get("id") or "").strip()
+                product_id = int(row.get("product_id") or 0)
+                quantity = int(row.get("quantity") or 0)
+                total_price_raw = float(row.get("total_price") or 0)
+                date_raw = (row.get("date") or "").strip()
+            else:
+                if len(row) < 5:
+                    errors.append({"row": index, "error": "Linha incompleta"})
+                    continue
+                source_id_raw = (row[0] or "").strip()
+                product_id = int(row[1] or 0)
+                quantity = int(row[2] or 0)
+                total_price_raw = float(row[3] or 0)
+                date_raw = (row[4] or "").strip()
+            if not (product_id and quantity and date_raw):
+                errors.append({"row": index, "error": "Campos obrigatorios ausentes"})
+                continue
+
+            date = datetime.strptime(date_raw, "%Y-%m-%d").date()
+            total_price_cents = int(round(total_price_raw * 100))
+            source_id = int(source_id_raw) if source_id_raw else None
+        except (ValueError, TypeError, OverflowError) as exc:
+            errors.append({"row": index, "error": f"Dados invalidos: {exc}"})
+            continue
+        if max(abs(product_id), abs(quantity), abs(total_price_cents)) > MAX_INTEGER:
+            errors.append({"row": index, "error": "Dados invalidos: valor fora do limite"})
+            continue
+
+        yield product_id, date.month, quantity, total_price_cents, date, source_id
+
+
+def can_parse_in_parallel(file_contents: bytes):
+    # Quoted fields may span lines, so only unquoted files are split on b"\n".
+    return (
+        SALES_PARSE_WORKERS > 1
+        and len(file_contents) >= PARALLEL_PARSE_MIN_BYTES
+        and b'"' not in file_contents
+    )
+
+
+def _split_lines(file_contents: bytes, start, chunk_bytes):
+    while start < len(file_contents):
+        end = file_contents.find(b"\n", start + chunk_bytes)
+        end = len(file_contents) if end == -1 else end + 1
+        yield file_contents[start:end]
+        start = end
+
+
+class _CountingReader:
+    def __init__(self, reader):
+        self.reader = reader
+        self.records = 0
+
+    def __iter__(self):
+        for row in self.reader:
+            self.records += 1
+            yield row
+
+
+def parse_sales_chunk(chunk: bytes, fieldnames):
+    """Parse one line-aligned chunk into CSV rows for COPY into the staging table.
+
+    Rows are numbered from 1 within the chunk; the caller shifts them by the
+    number of records in the preceding chunks.
+    """
+    lines = io.StringIO(chunk.decode("utf-8"))
+    if fieldnames is None:
+        reader = csv.reader(lines)
+    else:
+        reader = csv.DictReader(lines, fieldnames=fieldnames)
+
+    errors = []
+    counted = _CountingReader(reader)
+    output = io.StringIO()
+    writer = csv.writer(output)
+    staged = 0
+    for product_id, month, quantity, cents, date, source_id in parse_sales_rows(
+        counted, fieldnames is not None, errors
+    ):
+        writer.writerow((product_id, month, quantity, cents, date.isoformat(), source_id))
+        staged += 1
+    return output.getvalue().encode(), staged, counted.records, errors
+
+
+def _get_parse_pool():
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=SALES_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parse_pool
+
+
+async def iter_parsed_sales_chunks(file_contents: bytes):
+    """Yield ``(csv_payload, staged, errors)`` per chunk, in file order.
+
+    Error rows are renumbered so they match what ``parse_sales_rows`` reports
+    for the whole file.
+    """
+    bom = len(codecs.BOM_UTF8) if file_contents.startswith(codecs.BOM_UTF8) else 0
+    first_line_end = file_contents.find(b"\n") + 1 or len(file_contents)
+    header = next(
+        csv.reader([file_contents[bom:first_line_end].decode("utf-8")]), None
+    )
+    if header and "product_id" in header:
+        fieldnames, start = header, first_line_end
+    else:
+        fieldnames, start = None, bom
+
+    loop = asyncio.get_running_loop()
+    pool = _get_parse_pool()
+    pending = deque()
+    records_before = 0
+
+    async def next_result():
+        nonlocal records_before
+        payload, staged, records, errors = await pending.popleft()
+        for error in errors:
+            error["row"] += records_before
+        records_before += records
+        return payload, staged, errors
+
+    for chunk in _split_lines(file_contents, start, PARSE_CHUNK_BYTES):
+        pending.append(loop.run_in_executor(pool, parse_sales_chunk, chunk, fieldnames))
+        if len(pending) >= SALES_PARSE_WORKERS * 2:
+            yield await next_result()
+    while pending:
+        yield await next_result()
@@ -1,31 +1,276 @@
+import asyncio
 import csv
 import io
-from datetime import datetime
+import itertools
+import os
+import time
+from datetime import date as date_type, timedelta
 
-from sqlalchemy import Integer, func
+import pyarrow as pa
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    and_,
+    case,
+    cast,
+    func,
+    literal,
+    literal_column,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 
-from models import MonthlySales, Product, Sale
+from db import SessionLocal
+from models import MonthlySales, Product, Sale, SalesRollup
+from services.arrow_io import (
+    SALE_SCHEMA,
+    cents_to_decimal,
+    is_parquet,
+    iter_parquet_sales_batches,
+    stream_columnar_chunks,
+)
+from services.cache import TTLCache
+from services.csv_export import EXPORT_BATCH_SIZE, stream_csv_chunks
+from services.rollup_services import (
+    prune_sales_rollup,
+    remove_sales_from_rollup,
+    rollup_rows,
+    rollup_upsert,
+)
+from services.sales_parsing import (
+    can_parse_in_parallel,
+    iter_parsed_sales_chunks,
+    parse_sales_rows,
+    sales_reader,
+)
+from services.versions_services import (
+    bump_table_versions,
+    read_table_versions,
+    version_key,
+)
 
 
-def sales_summary(db, year=None):
-    overrides = {}
+sales_staging = Table(
+    "sales_staging",
+    MetaData(),
+    Column("product_id", Integer, nullable=False),
+    Column("month", Integer, nullable=False),
+    Column("quantity", Integer, nullable=False),
+    Column("total_price", Integer, nullable=False),
+    Column("date", Date, nullable=False),
+    Column("source_id", BigInteger, nullable=True),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+PARSE_BATCH_SIZE = 10000
+SUMMARY_GRANULARITIES = {
+    "day": "1 day",
+    "week": "1 week",
+    "month": "1 month",
+    "quarter": "3 months",
+}
+DEFAULT_SALES_SOURCE = "upload"
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+SALE_VALUE_COLUMNS = ("product_id", "month", "quantity", "total_price", "date")
+
+SALES_TABLES = ("monthly_sales", "sales")
+
+summary_cache = TTLCache(maxsize=128, ttl=300.0)
+
+
+def invalidate_sales_cache():
+    summary_cache.clear()
+
+
+def upload_sales_source(filename):
+    # Without ?source=, ids are scoped to the uploaded file name: re-sending a
+    # file updates its own sales, and unrelated files never share an id space.
+    name = os.path.basename((filename or "").replace("\\", "/")).strip()
+    for suffix in COMPRESSED_SUFFIXES:
+        name = name.removesuffix(suffix)
+    return f"file:{name}"[:100] if name else DEFAULT_SALES_SOURCE
+
+
+async def _sales_versions(db, versions):
+    # Cached bodies are keyed by the table versions read before the query, so a
+    # write from another process (or one racing this read) never reuses them.
+    if versions is None:
+        versions = version_key(await read_table_versions(db, *SALES_TABLES))
+    return versions
+
+
+def sales_date_range(year=None, start=None, end=None):
     if year:
-        override_rows = (
-            db.query(MonthlySales)
-            .filter(MonthlySales.year == year)
-            .all()
-        )
-        overrides = {item.month: item for item in override_rows}
+        year_start = date_type(year, 1, 1)
+        year_end = date_type(year + 1, 1, 1)
+        start = max(start, year_start) if start else year_start
+        end = min(end, year_end) if end else year_end
+    return start, end
+
+
+def filter_sales_dates(query, start=None, end=None):
+    if start:
+        query = query.where(Sale.date >= start)
+    if end:
+        query = query.where(Sale.date < end)
+    return query
+
 
-    query = db.query(
-        Sale.month,
-        func.sum(Sale.quantity).label("quantity"),
-        func.sum(Sale.total_price).label("total_price"),
+def _truncate(granularity, value):
+    # granularity is one of SUMMARY_GRANULARITIES, so it is safe to inline.
+    return func.date_trunc(literal_column(f"'{granularity}'"), cast(value, DateTime))
+
+
+async def _sales_period_summary(db, granularity, start, end):
+    if start is None or end is None:
+        first, last = (
+            await db.execute(select(func.min(Sale.date), func.max(Sale.date)))
+        ).one()
+        if first is None:
+            return []
+        start = start or first
+        end = end or last + timedelta(days=1)
+    if start >= end:
+        return []
+
+    # Quarters are summed from the month rows, so monthly overrides apply to
+    # them too. Day and week stay on raw sales: an override has no daily split.
+    series_granularity = "month" if granularity == "quarter" else granularity
+    period = _truncate(series_granularity, Sale.date)
+    totals = filter_sales_dates(
+        select(
+            period.label("period"),
+            func.sum(Sale.quantity).label("quantity"),
+            func.sum(Sale.total_price).label("total_price"),
+        ),
+        start,
+        end,
     )
+    totals = totals.group_by(period).subquery("totals")
+    series = select(
+        func.generate_series(
+            _truncate(series_granularity, literal(start, Date)),
+            _truncate(series_granularity, literal(end - timedelta(days=1), Date)),
+            literal_column(f"interval '{SUMMARY_GRANULARITIES[series_granularity]}'"),
+        ).label("period")
+    ).subquery("series")
+
+    quantity = func.coalesce(totals.c.quantity, 0)
+    total_price = func.coalesce(totals.c.total_price, 0)
+    source = series.outerjoin(totals, totals.c.period == series.c.period)
+    if series_granularity == "month":
+        source = source.outerjoin(
+            MonthlySales,
+            and_(
+                MonthlySales.year == func.extract("year", series.c.period).cast(Integer),
+                MonthlySales.month == func.extract("month", series.c.period).cast(Integer),
+            ),
+        )
+        quantity = func.coalesce(MonthlySales.quantity, quantity)
+        total_price = func.coalesce(MonthlySales.total_price, total_price)
+
+    periods = select(
+        series.c.period, quantity.label("quantity"), total_price.label("total_price")
+    ).select_from(source)
+    if granularity == "quarter":
+        months = periods.subquery("months")
+        quarter = _truncate("quarter", months.c.period)
+        periods = select(
+            quarter.label("period"),
+            func.sum(months.c.quantity).label("quantity"),
+            func.sum(months.c.total_price).label("total_price"),
+        ).group_by(quarter)
+    periods = periods.subquery("periods")
+
+    rows = (
+        await db.execute(
+            select(
+                cast(periods.c.period, Date).label("period"),
+                periods.c.quantity,
+                periods.c.total_price,
+                func.coalesce(
+                    periods.c.total_price
+                    - func.lag(periods.c.total_price).over(order_by=periods.c.period),
+                    0,
+                ).label("profit_variation"),
+            ).order_by(periods.c.period)
+        )
+    ).all()
+    return [
+        {
+            "period": row.period,
+            "month": row.period.month,
+            "quantity": int(row.quantity),
+            "total_price": float(row.total_price) / 100,
+            "profit_variation": float(row.profit_variation) / 100,
+        }
+        for row in rows
+    ]
+
+
+async def sales_summary(
+    db, year=None, start=None, end=None, granularity=None, versions=None
+):
+    versions = await _sales_versions(db, versions)
+    cache_key = ("summary", versions, year, start, end, granularity)
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    if granularity:
+        results = await _sales_period_summary(
+            db, granularity, *sales_date_range(year, start, end)
+        )
+        summary_cache.set(cache_key, results)
+        return results
+
+    overrides = {}
+    override_rows = []
     if year:
-        query = query.filter(func.extract("year", Sale.date) == year)
-    rows = query.group_by(Sale.month).order_by(Sale.month).all()
+        # Only months overlapping [start, end), like the month series does.
+        range_start, range_end = sales_date_range(year, start, end)
+        if range_start < range_end:
+            override_rows = (
+                await db.scalars(
+                    select(MonthlySales).where(
+                        MonthlySales.year == year,
+                        MonthlySales.month.between(
+                            range_start.month, (range_end - timedelta(days=1)).month
+                        ),
+                    )
+                )
+            ).all()
+        overrides = {item.month: item for item in override_rows}
+
+    if start or end:
+        query = select(
+            Sale.month,
+            func.sum(Sale.quantity).label("quantity"),
+            func.sum(Sale.total_price).label("total_price"),
+        )
+        query = filter_sales_dates(query, *sales_date_range(year, start, end))
+        query = query.group_by(Sale.month).order_by(Sale.month)
+    else:
+        query = select(
+            SalesRollup.month,
+            func.sum(SalesRollup.quantity).label("quantity"),
+            func.sum(SalesRollup.total_price).label("total_price"),
+        )
+        if year:
+            query = query.where(SalesRollup.year == year)
+        query = query.group_by(SalesRollup.month).order_by(SalesRollup.month)
+    rows = (await db.execute(query)).all()
 
     results = []
     for row in rows:
@@ -42,7 +287,7 @@ def sales_summary(db, year=None):
             results.append(
                 {
                     "month": row.month,
-                    "quantity": row.quantity or 0,
+                    "quantity": int(row.quantity or 0),
                     "total_price": float(row.total_price or 0) / 100,
                 }
             )
@@ -68,135 +313,470 @@ def sales_summary(db, year=None):
             item["profit_variation"] = item["total_price"] - previous_total
         previous_total = item["total_price"]
 
+    summary_cache.set(cache_key, results)
     return results
 
 
-def import_sales_from_csv(db, file_contents: bytes):
-    decoded = file_contents.decode("utf-8")
-    raw_lines = io.StringIO(decoded)
-    sniff_reader = csv.reader(raw_lines)
-    header = next(sniff_reader, None)
-    raw_lines.seek(0)
-
-    has_header = header and "product_id" in header
-    reader = (
-        csv.DictReader(raw_lines)
-        if has_header
-        else csv.reader(raw_lines)
-    )
+def _next_batch(rows, size=PARSE_BATCH_SIZE):
+    return list(itertools.islice(rows, size))
+
+
+async def _stage_sales_serial(raw_connection, file_contents, progress):
+    reader, has_header = await asyncio.to_thread(sales_reader, file_contents)
     errors = []
-    sales = []
+    rows = parse_sales_rows(reader, has_header, errors)
+    columns = [column.name for column in sales_staging.columns]
+    staged = 0
+    while batch := await asyncio.to_thread(_next_batch, rows):
+        await raw_connection.copy_records_to_table(
+            sales_staging.name, records=batch, columns=columns
+        )
+        staged += len(batch)
+        if progress:
+            await progress(staged + len(errors), len(errors))
+    return errors
 
-    for index, row in enumerate(reader, start=1):
-        try:
-            if has_header:
-                product_id = int(row.get("product_id") or 0)
-                quantity = int(row.get("quantity") or 0)
-                total_price_raw = float(row.get("total_price") or 0)
-                date_raw = (row.get("date") or "").strip()
-            else:
-                if len(row) < 5:
-                    skipped += 1
-                    errors.append({"row": index, "error": "Linha incompleta"})
-                    continue
-                product_id = int(row[1] or 0)
-                quantity = int(row[2] or 0)
-                total_price_raw = float(row[3] or 0)
-                date_raw = (row[4] or "").strip()
-            if not (product_id and quantity and date_raw):
-                errors.append({"row": index, "error": "Campos obrigatorios ausentes"})
-                continue
-
-            date = datetime.strptime(date_raw, "%Y-%m-%d").date()
-            month = date.month
-            total_price_cents = int(round(total_price_raw * 100))
-
-            sales.append(
-                Sale(
-                    product_id=product_id,
-                    month=month,
-                    quantity=quantity,
-                    total_price=total_price_cents,
-                    date=date,
-                )
+
+async def _iter_in_thread(iterator):
+    while (item := await asyncio.to_thread(next, iterator, None)) is not None:
+        yield item
+
+
+async def _stage_sales_payloads(raw_connection, payloads, progress):
+    errors = []
+    columns = [column.name for column in sales_staging.columns]
+    staged = 0
+    async for payload, chunk_staged, chunk_errors in payloads:
+        errors.extend(chunk_errors)
+        # Once the file is known to be invalid, keep parsing only to report errors.
+        if payload and not errors:
+            await raw_connection.copy_to_table(
+                sales_staging.name, source=payload, columns=columns, format="csv"
             )
-        except (ValueError, TypeError) as exc:
-            errors.append({"row": index, "error": f"Dados invalidos: {exc}"})
+        staged += chunk_staged
+        if progress:
+            await progress(staged + len(errors), len(errors))
+    return errors
+
+
+def _sale_values(columns):
+    return tuple_(*(columns[name] for name in SALE_VALUE_COLUMNS))
+
+
+async def _merge_staged_sales(db, source):
+    # Serializes uploads of the same source so the rollup deltas below stay exact.
+    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(source))))
+
+    sales = Sale.__table__
+    previous = (
+        select(sales.c.date, sales.c.month, sales.c.quantity, sales.c.total_price)
+        .join(
+            sales_staging,
+            and_(
+                sales.c.source == source,
+                sales.c.source_id == sales_staging.c.source_id,
+            ),
+        )
+        .where(_sale_values(sales.c).is_distinct_from(_sale_values(sales_staging.c)))
+        .subquery()
+    )
+    await remove_sales_from_rollup(db, previous)
+
+    upsert = insert(Sale).from_select(
+        [*SALE_VALUE_COLUMNS, "source_id", "source"],
+        select(
+            *(sales_staging.c[name] for name in SALE_VALUE_COLUMNS),
+            sales_staging.c.source_id,
+            literal(source, String),
+        ),
+    )
+    upsert = upsert.on_conflict_do_update(
+        constraint="uq_sales_source",
+        set_={name: upsert.excluded[name] for name in SALE_VALUE_COLUMNS},
+        where=_sale_values(sales.c).is_distinct_from(_sale_values(upsert.excluded)),
+    )
+    upserted = upsert.returning(
+        sales.c.date,
+        sales.c.month,
+        sales.c.quantity,
+        sales.c.total_price,
+        literal_column("xmax = 0", Boolean).label("inserted"),
+    ).cte("upserted")
+    counts = (
+        select(
+            func.count().filter(upserted.c.inserted).label("inserted"),
+            func.count().filter(~upserted.c.inserted).label("updated"),
+            select(func.count())
+            .select_from(sales_staging)
+            .scalar_subquery()
+            .label("staged"),
+        )
+        .select_from(upserted)
+        .add_cte(rollup_upsert(rollup_rows(upserted)).cte("rolled_up"))
+    )
+    inserted, updated, staged = (await db.execute(counts)).one()
+    await prune_sales_rollup(db)
+    return inserted, updated, staged - inserted - updated
+
+
+async def import_sales_from_csv(
+    db, file_contents: bytes, progress=None, source=DEFAULT_SALES_SOURCE
+):
+    started = time.perf_counter()
+    connection = await db.connection()
+    await connection.run_sync(sales_staging.create)
+    raw_connection = (await connection.get_raw_connection()).driver_connection
+    if is_parquet(file_contents):
+        payloads = _iter_in_thread(iter_parquet_sales_batches(file_contents))
+        errors = await _stage_sales_payloads(raw_connection, payloads, progress)
+    elif can_parse_in_parallel(file_contents):
+        payloads = iter_parsed_sales_chunks(file_contents)
+        errors = await _stage_sales_payloads(raw_connection, payloads, progress)
+    else:
+        errors = await _stage_sales_serial(raw_connection, file_contents, progress)
 
     if errors:
+        await db.rollback()
         return {"created": 0, "skipped": 0, "errors": errors}
 
-    product_ids = {sale.product_id for sale in sales}
-    if product_ids:
-        existing_ids = {
-            row.id
-            for row in db.query(Product.id)
-            .filter(Product.id.in_(product_ids))
-            .all()
+    missing = (
+        await db.scalars(
+            select(sales_staging.c.product_id)
+            .distinct()
+            .outerjoin(Product, Product.id == sales_staging.c.product_id)
+            .where(Product.id.is_(None))
+            .order_by(sales_staging.c.product_id)
+        )
+    ).all()
+    if missing:
+        await db.rollback()
+        return {
+            "created": 0,
+            "skipped": 0,
+            "errors": [
+                {
+                    "row": 0,
+                    "error": f"Produtos inexistentes: {', '.join(map(str, missing))}",
+                }
+            ],
+        }
+
+    duplicated = (
+        await db.scalars(
+            select(sales_staging.c.source_id)
+            .where(sales_staging.c.source_id.is_not(None))
+            .group_by(sales_staging.c.source_id)
+            .having(func.count() > 1)
+            .order_by(sales_staging.c.source_id)
+        )
+    ).all()
+    if duplicated:
+        await db.rollback()
+        return {
+            "created": 0,
+            "skipped": 0,
+            "errors": [
+                {
+                    "row": 0,
+                    "error": f"Ids repetidos no arquivo: {', '.join(map(str, duplicated))}",
+                }
+            ],
         }
-        missing = sorted(product_ids - existing_ids)
-        if missing:
-            return {
-                "created": 0,
-                "skipped": 0,
-                "errors": [
-                    {
-                        "row": 0,
-                        "error": f"Produtos inexistentes: {', '.join(map(str, missing))}",
-                    }
-                ],
-            }
 
     try:
-        db.add_all(sales)
-        db.commit()
-        created = len(sales)
+        created, updated, unchanged = await _merge_staged_sales(db, source)
+        if created or updated:
+            await bump_table_versions(db, "sales")
+        await db.commit()
+        invalidate_sales_cache()
     except IntegrityError as exc:
-        db.rollback()
+        await db.rollback()
         return {
             "created": 0,
             "skipped": 0,
             "errors": [{"row": 0, "error": f"Duplicado ou violacao: {exc.orig}"}],
         }
 
-    return {"created": created, "skipped": 0, "errors": []}
+    elapsed = time.perf_counter() - started
+    return {
+        "created": created,
+        "updated": updated,
+        "unchanged": unchanged,
+        "skipped": unchanged,
+        "source": source,
+        "errors": [],
+        "rows_per_second": (
+            round((created + updated + unchanged) / elapsed, 1) if elapsed > 0 else 0.0
+        ),
+    }
+
+
+def _format_sale_row(row):
+    return (
+        row.id,
+        row.product_id,
+        row.quantity,
+        f"{row.total_price / 100:.2f}",
+        row.date.isoformat() if row.date else "",
+    )
+
+
+def _sales_cents_to_decimal(columns):
+    return {
+        **columns,
+        "total_price": cents_to_decimal(pa.array(columns["total_price"], pa.int64())),
+    }
+
+
+async def iter_sales_export(year=None, start=None, end=None, export_format="csv"):
+    async with SessionLocal() as db:
+        query = select(
+            Sale.id, Sale.product_id, Sale.quantity, Sale.total_price, Sale.date
+        )
+        query = filter_sales_dates(query, *sales_date_range(year, start, end))
+        result = await db.stream(
+            query.order_by(Sale.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        if export_format == "csv":
+            chunks = stream_csv_chunks(
+                ["id", "product_id", "quantity", "total_price", "date"],
+                result,
+                _format_sale_row,
+            )
+        else:
+            chunks = stream_columnar_chunks(
+                SALE_SCHEMA, result, export_format, _sales_cents_to_decimal
+            )
+        async for chunk in chunks:
+            yield chunk
+
+
+async def sales_years(db, versions=None):
+    cache_key = ("years", await _sales_versions(db, versions))
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    sales_years = await db.scalars(
+        select(SalesRollup.year).where(SalesRollup.year.isnot(None)).distinct()
+    )
+    override_years = await db.scalars(select(MonthlySales.year).distinct())
+    years = {year for year in sales_years if year is not None}
+    years.update({year for year in override_years if year is not None})
+    years = sorted(years)
+    summary_cache.set(cache_key, years)
+    return years
+
+
+async def sales_comparison(db, years=None, versions=None):
+    versions = await _sales_versions(db, versions)
+    cache_key = ("compare", versions, tuple(years) if years else None)
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    rollup = select(
+        SalesRollup.year, SalesRollup.month, SalesRollup.quantity, SalesRollup.total_price
+    ).where(SalesRollup.year.isnot(None))
+    overrides = select(
+        MonthlySales.year,
+        MonthlySales.month,
+        MonthlySales.quantity,
+        MonthlySales.total_price,
+    )
+    if years:
+        rollup = rollup.where(SalesRollup.year.in_(years))
+        overrides = overrides.where(MonthlySales.year.in_(years))
+    rollup = rollup.subquery("rollup_totals")
+    overrides = overrides.subquery("overrides")
+
+    totals = (
+        select(
+            func.coalesce(overrides.c.year, rollup.c.year).label("year"),
+            func.coalesce(overrides.c.month, rollup.c.month).label("month"),
+            func.coalesce(overrides.c.quantity, rollup.c.quantity).label("quantity"),
+            func.coalesce(overrides.c.total_price, rollup.c.total_price).label(
+                "total_price"
+            ),
+        )
+        .select_from(rollup)
+        .join(
+            overrides,
+            and_(overrides.c.year == rollup.c.year, overrides.c.month == rollup.c.month),
+            full=True,
+        )
+        .subquery("totals")
+    )
+
+    by_year = {"partition_by": totals.c.year, "order_by": totals.c.month}
+    by_month = {"partition_by": totals.c.month, "order_by": totals.c.year}
+    previous_month_total = func.lag(totals.c.total_price).over(**by_year)
+    previous_year = func.lag(totals.c.year).over(**by_month)
+    previous_year_total = func.lag(totals.c.total_price).over(**by_month)
+    query = select(
+        totals.c.year,
+        totals.c.month,
+        totals.c.quantity,
+        totals.c.total_price,
+        func.coalesce(totals.c.total_price - previous_month_total, 0).label(
+            "profit_variation"
+        ),
+        case(
+            (
+                previous_year == totals.c.year - 1,
+                totals.c.total_price - previous_year_total,
+            ),
+        ).label("yoy_variation"),
+    ).order_by(totals.c.year, totals.c.month)
+
+    results = [
+        {
+            "year": row.year,
+            "month": row.month,
+            "quantity": int(row.quantity),
+            "total_price": float(row.total_price) / 100,
+            "profit_variation": float(row.profit_variation) / 100,
+            "yoy_variation": (
+                float(row.yoy_variation) / 100
+                if row.yoy_variation is not None
+                else None
+            ),
+        }
+        for row in await db.execute(query)
+    ]
+    summary_cache.set(cache_key, results)
+    return results
+
+
+OVERRIDE_BATCH_SIZE = 1000
+OVERRIDE_COLUMNS = ("year", "month", "quantity", "total_price")
+MAX_INTEGER = 2**31 - 1
 
 
-def sales_years(db):
-    year_value = func.extract("year", Sale.date).cast(Integer).label("year")
-    sales_years = (
-        db.query(year_value)
-        .filter(Sale.date.isnot(None))
-        .distinct()
-        .all()
+def _monthly_sales_upsert(rows):
+    stmt = insert(MonthlySales).values(rows)
+    return stmt.on_conflict_do_update(
+        constraint="uq_monthly_sales",
+        set_={
+            "quantity": stmt.excluded.quantity,
+            "total_price": stmt.excluded.total_price,
+        },
     )
-    override_years = db.query(MonthlySales.year).distinct().all()
-    years = {row.year for row in sales_years if row.year is not None}
-    years.update({row.year for row in override_years if row.year is not None})
-    return sorted(years)
 
 
-def upsert_monthly_sales(db, year: int, month: int, quantity: int, total_price: float):
-    entry = (
-        db.query(MonthlySales)
-        .filter(MonthlySales.year == year, MonthlySales.month == month)
-        .first()
+async def upsert_monthly_sales(db, year: int, month: int, quantity: int, total_price: float):
+    stmt = _monthly_sales_upsert(
+        [
+            {
+                "year": year,
+                "month": month,
+                "quantity": quantity,
+                "total_price": int(round(total_price * 100)),
+            }
+        ]
     )
-    total_price_cents = int(round(total_price * 100))
-    if entry:
-        entry.quantity = quantity
-        entry.total_price = total_price_cents
-        db.commit()
-        db.refresh(entry)
-        return entry
-
-    entry = MonthlySales(
-        year=year,
-        month=month,
-        quantity=quantity,
-        total_price=total_price_cents,
+    entry = await db.scalar(
+        stmt.returning(MonthlySales).execution_options(populate_existing=True)
     )
-    db.add(entry)
-    db.commit()
-    db.refresh(entry)
+    await bump_table_versions(db, "monthly_sales")
+    await db.commit()
+    invalidate_sales_cache()
     return entry
+
+
+def _monthly_sales_rows(entries):
+    rows = {}
+    errors = []
+    for index, year, month, quantity, total_price_cents in entries:
+        if not 1 <= month <= 12:
+            errors.append({"row": index, "error": "Mes invalido"})
+            continue
+        if abs(quantity) > MAX_INTEGER or abs(total_price_cents) > MAX_INTEGER:
+            errors.append({"row": index, "error": "Valor fora do limite"})
+            continue
+        if (year, month) in rows:
+            errors.append({"row": index, "error": "Mes duplicado"})
+            continue
+        rows[(year, month)] = {
+            "year": year,
+            "month": month,
+            "quantity": quantity,
+            "total_price": total_price_cents,
+        }
+    return list(rows.values()), errors
+
+
+async def _apply_monthly_sales_rows(db, rows):
+    created = 0
+    for start in range(0, len(rows), OVERRIDE_BATCH_SIZE):
+        stmt = _monthly_sales_upsert(rows[start : start + OVERRIDE_BATCH_SIZE])
+        inserted = await db.scalars(
+            stmt.returning(literal_column("xmax = 0", Boolean))
+        )
+        created += sum(inserted.all())
+    await bump_table_versions(db, "monthly_sales")
+    await db.commit()
+    invalidate_sales_cache()
+    return {"created": created, "updated": len(rows) - created, "skipped": 0, "errors": []}
+
+
+async def upsert_monthly_sales_bulk(db, entries):
+    rows, errors = _monthly_sales_rows(
+        (
+            index,
+            entry.year,
+            entry.month,
+            entry.quantity,
+            int(round(entry.total_price * 100)),
+        )
+        for index, entry in enumerate(entries, start=1)
+    )
+    if errors:
+        return {"created": 0, "updated": 0, "skipped": 0, "errors": errors}
+    return await _apply_monthly_sales_rows(db, rows)
+
+
+def _parse_monthly_sales_csv(file_contents: bytes):
+    decoded = file_contents.decode("utf-8")
+    reader = csv.DictReader(io.StringIO(decoded))
+    fieldnames = [name.strip() for name in (reader.fieldnames or [])]
+    if sorted(fieldnames) != sorted(OVERRIDE_COLUMNS):
+        return [], [
+            {
+                "row": 0,
+                "error": "CSV invalido: colunas esperadas year,month,quantity,total_price",
+            }
+        ]
+    reader.fieldnames = fieldnames
+
+    entries = []
+    errors = []
+    for index, row in enumerate(reader, start=1):
+        try:
+            entries.append(
+                (
+                    index,
+                    int(row["year"]),
+                    int(row["month"]),
+                    int(row["quantity"]),
+                    int(round(float(row["total_price"]) * 100)),
+                )
+            )
+        except (ValueError, TypeError, OverflowError) as exc:
+            errors.append({"row": index, "error": f"Dados invalidos: {exc}"})
+
+    rows, row_errors = _monthly_sales_rows(entries)
+    errors.extend(row_errors)
+    errors.sort(key=lambda item: item["row"])
+    return rows, errors
+
+
+async def import_monthly_sales_from_csv(db, file_contents: bytes, progress=None):
+    rows, errors = await asyncio.to_thread(_parse_monthly_sales_csv, file_contents)
+    if progress:
+        await progress(len(rows) + len(errors), len(errors))
+    if errors:
+        return {"created": 0, "updated": 0, "skipped": 0, "errors": errors}
+    if not rows:
+        return {"created": 0, "updated": 0, "skipped": 0, "errors": []}
+    return await _apply_monthly_sales_rows(db, rows)
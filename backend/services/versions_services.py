@@ -0,0 +1,65 @@
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from sqlalchemy import func, select, update
+
+from models import TableVersion
+
+
+async def bump_table_versions(db, *tables):
+    await db.execute(
+        update(TableVersion)
+        .where(TableVersion.name.in_(tables))
+        .values(version=TableVersion.version + 1, updated_at=func.now())
+    )
+
+
+def _is_not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if not (if_modified_since and last_modified):
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+async def read_table_versions(db, *tables):
+    return (
+        await db.execute(
+            select(TableVersion.name, TableVersion.version, TableVersion.updated_at)
+            .where(TableVersion.name.in_(tables))
+            .order_by(TableVersion.name)
+        )
+    ).all()
+
+
+def version_key(rows):
+    return tuple((row.name, row.version) for row in rows)
+
+
+def conditional_headers(request, rows):
+    digest = hashlib.sha1(request.url.path.encode("utf-8"))
+    for row in rows:
+        digest.update(f"|{row.name}:{row.version}".encode("utf-8"))
+    digest.update(f"?{request.url.query}".encode("utf-8"))
+    etag = f'W/"{digest.hexdigest()[:20]}"'
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    last_modified = max((row.updated_at for row in rows), default=None)
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(timezone.utc), usegmt=True
+        )
+    return headers, _is_not_modified(request, etag, last_modified)
+
+
+async def get_conditional(db, request, *tables):
+    return conditional_headers(request, await read_table_versions(db, *tables))
@@ -0,0 +1,90 @@
+import asyncio
+import csv
+import io
+
+import pytest
+
+from services import sales_parsing
+
+ROWS = [
+    "1,10,2,19.90,2025-01-15",
+    "2,11,,5.00,2025-01-16",
+    "3,12,1,abc,2025-02-01",
+    "",
+    "4,13,1,7.50",
+    "5,14,3,9.99,2025-13-01",
+    "6,15,1,1.00,2025-03-03",
+    "7,16,1,inf,2025-03-04",
+    "8,17,1,nan,2025-03-05",
+    "9,18,1,30000000,2025-03-06",
+] * 40
+HEADER = "id,product_id,quantity,total_price,date"
+
+
+def _serial(file_contents):
+    reader, has_header = sales_parsing.sales_reader(file_contents)
+    errors = []
+    rows = [
+        (product_id, month, quantity, cents, date.isoformat(), source_id)
+        for product_id, month, quantity, cents, date, source_id in (
+            sales_parsing.parse_sales_rows(reader, has_header, errors)
+        )
+    ]
+    return rows, errors
+
+
+def _parallel(file_contents):
+    async def collect():
+        rows, errors = [], []
+        async for payload, _, chunk_errors in sales_parsing.iter_parsed_sales_chunks(
+            file_contents
+        ):
+            for row in csv.reader(io.StringIO(payload.decode())):
+                product_id, month, quantity, cents, date, source_id = row
+                rows.append(
+                    (
+                        int(product_id),
+                        int(month),
+                        int(quantity),
+                        int(cents),
+                        date,
+                        int(source_id) if source_id else None,
+                    )
+                )
+            errors.extend(chunk_errors)
+        return rows, errors
+
+    return asyncio.run(collect())
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Tiny chunks force many splits, some of them right after a blank line.
+    monkeypatch.setattr(sales_parsing, "PARSE_CHUNK_BYTES", 97)
+    monkeypatch.setattr(sales_parsing, "SALES_PARSE_WORKERS", 2)
+
+
+@pytest.mark.parametrize("header", [True, False])
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("trailing_newline", [True, False])
+@pytest.mark.parametrize("bom", [True, False])
+def test_parallel_parse_matches_serial(
+    small_chunks, header, newline, trailing_newline, bom
+):
+    lines = ([HEADER] if header else []) + ROWS
+    text = newline.join(lines) + (newline if trailing_newline else "")
+    file_contents = text.encode("utf-8-sig" if bom else "utf-8")
+
+    serial_rows, serial_errors = _serial(file_contents)
+    parallel_rows, parallel_errors = _parallel(file_contents)
+
+    assert serial_errors
+    assert parallel_errors == serial_errors
+    assert parallel_rows == serial_rows
+
+
+def test_bom_keeps_the_id_column():
+    file_contents = f"{HEADER}\n1,10,2,19.90,2025-01-15\n".encode("utf-8-sig")
+    rows, errors = _serial(file_contents)
+    assert errors == []
+    assert rows[0][-1] == 1